@@ -0,0 +1,191 @@
+"""
+Batch image processing: apply a chain of operations to every image in a directory tree, headless.
+
+Example (run from the "2. Images" folder):
+    python 5_batch.py input_dir output_dir --op rescale:0.5 --op gaussian:7:3 --op threshold:80
+
+- Images are decoded by a few threads in this process and handed to a pool of worker processes (started
+  with "spawn", which is safe next to the running decoder threads) through shared memory (no pickling of
+  pixel data). Workers apply the operations and write the result to the
+  same relative path under output_dir.
+- Finished files are appended to output_dir/.batch_progress, so running the same command again after an
+  interruption resumes where it stopped. The file starts with the operation chain: with other --op values,
+  every image is processed again.
+- A throughput report (images/s and MB/s) is printed at the end, and written as JSON with --report.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import cv2 as cv
+import numpy as np
+from _imageOps_module import OPS, apply_ops, parse_op
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff"}
+PROGRESS_FILE = ".batch_progress"
+
+
+# all image files under root, as sorted relative paths
+def find_images(root):
+    found = []
+    for folder, _dirs, files in os.walk(root):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                found.append(os.path.relpath(os.path.join(folder, name), root))
+    return sorted(found)
+
+
+# first line of the progress file: the operation chain the listed files were processed with
+def ops_header(ops):
+    return "ops: " + json.dumps([[name, list(args)] for name, args in ops])
+
+
+# files already processed with the same operations, or None (no progress file, or one for other operations)
+def load_progress(path, ops):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        if f.readline().rstrip("\n") != ops_header(ops):
+            return None
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+# Attach to an existing block owned by the main process (which unlinks it)
+def attach_shared(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # pool workers share the main process' resource tracker, which already knows the block
+    return shared_memory.SharedMemory(name=name)
+
+
+# Worker process: attach to the decoded image in shared memory, apply the operations, write the result
+def process_shared(shm_name, shape, dtype, ops, out_path):
+    shm = attach_shared(shm_name)
+    try:
+        img = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        result = apply_ops(img, ops)
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        ok = cv.imwrite(out_path, result)
+        out_bytes = result.nbytes
+        del img, result     # release the views into shm.buf before closing it
+    finally:
+        shm.close()
+    if not ok:
+        raise IOError(f"could not write {out_path}")
+    return out_bytes
+
+
+# Decode thread: read an image into a new shared memory block
+def decode_to_shared(path):
+    img = cv.imread(path, cv.IMREAD_UNCHANGED)
+    if img is None:
+        return None, None
+    shm = shared_memory.SharedMemory(create=True, size=max(1, img.nbytes))
+    np.ndarray(img.shape, dtype=img.dtype, buffer=shm.buf)[...] = img
+    return shm, img
+
+
+def run_batch(src, dst, ops, workers=None, decode_threads=4, max_in_flight=None):
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers    # caps the decoded images held in shared memory
+
+    os.makedirs(dst, exist_ok=True)
+    progress_path = os.path.join(dst, PROGRESS_FILE)
+    done = load_progress(progress_path, ops)
+    if done is None:
+        # new run, or the files listed were made with other operations: start over (their outputs get overwritten)
+        if os.path.exists(progress_path):
+            print(f"{progress_path} was written for other operations, processing every image again", file=sys.stderr)
+        with open(progress_path, "w") as progress:
+            progress.write(ops_header(ops) + "\n")
+        done = set()
+    pending = [rel for rel in find_images(src) if rel not in done]
+
+    stats = {"images": 0, "skipped": len(done), "failed": [], "input_bytes": 0, "decoded_bytes": 0, "output_bytes": 0}
+    start = time.perf_counter()
+
+    with open(progress_path, "a") as progress, \
+            ThreadPoolExecutor(decode_threads) as decoders, \
+            ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn")) as pool:
+        # spawn, not fork: the decoder threads hold the resource tracker's lock while creating shared memory,
+        # and a worker forked at that moment would inherit the lock held and hang attaching to its block
+
+        queue = iter(pending)
+        decoding = {}       # decode future -> relative path
+        running = {}        # worker future -> (relative path, shared memory)
+
+        def fill():
+            while len(decoding) + len(running) < max_in_flight:
+                rel = next(queue, None)
+                if rel is None:
+                    return
+                decoding[decoders.submit(decode_to_shared, os.path.join(src, rel))] = rel
+
+        fill()
+        while decoding or running:
+            finished, _ = wait(list(decoding) + list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future in decoding:
+                    rel = decoding.pop(future)
+                    shm, img = future.result()
+                    if shm is None:
+                        stats["failed"].append(rel)
+                        continue
+                    stats["input_bytes"] += os.path.getsize(os.path.join(src, rel))
+                    stats["decoded_bytes"] += img.nbytes
+                    job = pool.submit(process_shared, shm.name, img.shape, img.dtype.str, ops, os.path.join(dst, rel))
+                    running[job] = (rel, shm)
+                else:
+                    rel, shm = running.pop(future)
+                    shm.close()
+                    shm.unlink()
+                    try:
+                        stats["output_bytes"] += future.result()
+                    except Exception as error:
+                        print(f"{rel}: {error}", file=sys.stderr)
+                        stats["failed"].append(rel)
+                        continue
+                    progress.write(rel + "\n")
+                    progress.flush()
+                    stats["images"] += 1
+            fill()
+
+    seconds = time.perf_counter() - start
+    stats["seconds"] = seconds
+    stats["images_per_s"] = stats["images"] / seconds if seconds else 0.0
+    stats["input_mb_per_s"] = stats["input_bytes"] / 1e6 / seconds if seconds else 0.0
+    stats["decoded_mb_per_s"] = stats["decoded_bytes"] / 1e6 / seconds if seconds else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a chain of image operations to a directory tree.")
+    parser.add_argument("src", help="input directory (searched recursively)")
+    parser.add_argument("dst", help="output directory (same relative paths as src)")
+    parser.add_argument("--op", action="append", default=[], type=parse_op,
+                        help=f"operation name:arg:arg, applied in order ({', '.join(OPS)})")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--decode-threads", type=int, default=4, help="decoder threads in the main process")
+    parser.add_argument("--report", help="write the throughput report to this JSON file")
+    args = parser.parse_args()
+
+    stats = run_batch(args.src, args.dst, args.op, workers=args.workers, decode_threads=args.decode_threads)
+
+    print(f"Processed {stats['images']} images in {stats['seconds']:.2f}s "
+          f"({stats['skipped']} already done, {len(stats['failed'])} failed)")
+    print(f"Throughput: {stats['images_per_s']:.1f} images/s, {stats['input_mb_per_s']:.1f} MB/s read, "
+          f"{stats['decoded_mb_per_s']:.1f} MB/s decoded")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(stats, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+This module collects the single-image operations from the "2. Images" and "3. Noise Removal" scripts
+(crop, resize, rescale, blurring, grayscale and thresholding) as plain functions, so they can be chained
+and run without a window, e.g. by the batch tool in `5_batch.py`.
+
+Operations are written as short strings, "name:arg1:arg2", for example:
+- "rescale:0.5"              rescale(img, 0.5) from 4_resize2.py
+- "resize:650:650"           cv.resize to 650x650
+- "crop:200:300:100:500"     img[200:300, 100:500]
+- "blur:7", "gaussian:7:10", "median:7"
+- "gray", "threshold:80"
+"""
+
+import cv2 as cv
+
+
+#resize by scale factor (50%)
+def rescale(image, scale=0.50):
+    width = int(image.shape[1] * scale)
+    height = int(image.shape[0] * scale)
+    dimensions = (width, height)
+    return cv.resize(image, dimensions, interpolation=cv.INTER_AREA)
+
+
+def resize(image, width, height):
+    return cv.resize(src=image, dsize=(int(width), int(height)))
+
+
+# Cropping syntax: img[y_start:y_end, x_start:x_end]
+def crop(image, y_start, y_end, x_start, x_end):
+    return image[int(y_start):int(y_end), int(x_start):int(x_end)]
+
+
+def blur(image, ksize=7):
+    return cv.blur(src=image, ksize=(int(ksize), int(ksize)))
+
+
+def gaussian(image, ksize=7, sigma=0):
+    return cv.GaussianBlur(src=image, ksize=(int(ksize), int(ksize)), sigmaX=float(sigma))
+
+
+def median(image, ksize=7):
+    return cv.medianBlur(src=image, ksize=int(ksize))
+
+
+def gray(image):
+    if image.ndim == 2:
+        return image
+    return cv.cvtColor(image, cv.COLOR_BGR2GRAY)
+
+
+def threshold(image, thresh=80, maxval=255):
+    _ret, th_img = cv.threshold(src=gray(image), thresh=float(thresh), maxval=float(maxval), type=cv.THRESH_BINARY)
+    return th_img
+
+
+OPS = {
+    "rescale": rescale,
+    "resize": resize,
+    "crop": crop,
+    "blur": blur,
+    "gaussian": gaussian,
+    "median": median,
+    "gray": gray,
+    "threshold": threshold,
+}
+
+
+# "gaussian:7:10" -> ("gaussian", [7.0, 10.0])
+def parse_op(text):
+    name, *args = text.split(":")
+    if name not in OPS:
+        raise ValueError(f"unknown operation {name!r}, expected one of {', '.join(OPS)}")
+    return name, [float(arg) for arg in args]
+
+
+def apply_ops(image, ops):
+    for name, args in ops:
+        image = OPS[name](image, *args)
+    return image
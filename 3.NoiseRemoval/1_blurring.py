@@ -3,9 +3,10 @@ Applying different types of blurring techniques in OpenCV to reduce noise and sm
 """
 
 import cv2 as cv
+from _imageCache_module import load_image  # cv.imread with a decoded-image cache
 
 # Read image
-img = cv.imread("cat1.png")
+img = load_image("cat1.png")  # decoded once, later runs memory-map the cached array
 
 # Apply different blurring techniques:
 # 1. Simple Average Blur - each pixel is replaced by the average of its neighborhood
@@ -52,4 +53,12 @@ Parameters:
 ksize defines the size of the neighborhood. Here, it is set to 7, so each pixel will be replaced by the median of a 7x7 neighborhood.
 How it works: The median filter sorts all pixel values within the kernel and then selects the middle (median) value as the new pixel value. This approach is particularly effective at preserving edges and reducing the impact of outlier noise, such as single bright or dark pixels (salt-and-pepper noise).
 Use cases: Median blur is ideal for removing salt-and-pepper noise (isolated, contrasting pixels), making it useful in images with impulse noise. It’s commonly used in preprocessing stages for image segmentation or object detection.
-"""
\ No newline at end of file
+"""
+
+"""
+Very large images (e.g. gigapixel scans):
+All three filters only look at a (ksize x ksize) neighbourhood, so a huge image can be filtered tile by tile
+(with ksize // 2 pixels of overlap) and give exactly the same result with much less memory.
+See `tiled_filter` in _tiledFilter_module.py, e.g.:
+    tiled_filter(img, "gaussian", ksize=7, sigma=10, out=open_output("out.npy", img.shape, img.dtype))
+"""
@@ -9,9 +9,10 @@ We will use three different types of blurring techniques to smooth the image:
 """
 
 import cv2 as cv
+from _imageCache_module import load_image  # cv.imread with a decoded-image cache
 
 # Read the image
-img = cv.imread("noisyImg.png")
+img = load_image("noisyImg.png")  # decoded once, later runs memory-map the cached array
 
 # 1. Simple Average Blur:
 blurred_img = cv.blur(img, (7, 7))
@@ -0,0 +1,170 @@
+"""
+Benchmark: Noise Reduction Quality vs. Speed
+
+2_demo.py compares the blurring techniques by eye. This script measures them:
+1. Takes a clean reference image (cat1.png) at several resolutions.
+2. Adds synthetic noise (Gaussian noise and salt-and-pepper noise) with a fixed random seed.
+3. Runs every filter (cv.blur, cv.GaussianBlur, cv.medianBlur) over a sweep of kernel sizes and sigmas.
+4. Records the quality against the clean image (PSNR and SSIM, higher is better) and the speed
+   (latency percentiles in ms and megapixels per second).
+5. Writes everything to a JSON file, so you can pick the cheapest filter that reaches a quality bar
+   and compare runs before/after a change.
+
+Run (from the "3. NoiseRemoval" folder):
+    python 3_benchmark.py --output denoise_benchmark.json
+    python 3_benchmark.py --quick     # smaller sweep
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+
+import cv2 as cv
+import numpy as np
+from _tiledFilter_module import apply_filter
+
+
+# ================================
+# Synthetic noise models
+# ================================
+def add_gaussian_noise(img, sigma, rng):
+    noise = rng.normal(0.0, sigma, img.shape)
+    return np.clip(img.astype(np.float64) + noise, 0, 255).astype(np.uint8)
+
+
+def add_salt_and_pepper(img, amount, rng):
+    noisy = img.copy()
+    pixels = rng.random(img.shape[:2])
+    noisy[pixels < amount / 2] = 0            # pepper
+    noisy[pixels > 1 - amount / 2] = 255      # salt
+    return noisy
+
+
+NOISE_MODELS = {"gaussian": add_gaussian_noise, "salt_pepper": add_salt_and_pepper}
+
+
+# ================================
+# Quality metrics
+# ================================
+def psnr(reference, img):
+    return float(cv.PSNR(reference, img))
+
+
+# Structural similarity (Wang et al. 2004), 11x11 Gaussian window with sigma 1.5, averaged over channels
+def ssim(reference, img):
+    C1, C2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    x, y = reference.astype(np.float64), img.astype(np.float64)
+
+    def window(a):
+        return cv.GaussianBlur(a, (11, 11), 1.5)
+
+    mu_x, mu_y = window(x), window(y)
+    var_x = window(x * x) - mu_x * mu_x
+    var_y = window(y * y) - mu_y * mu_y
+    cov = window(x * y) - mu_x * mu_y
+
+    ssim_map = ((2 * mu_x * mu_y + C1) * (2 * cov + C2)) / ((mu_x ** 2 + mu_y ** 2 + C1) * (var_x + var_y + C2))
+    return float(ssim_map.mean())
+
+
+# ================================
+# Timing
+# ================================
+def measure(fn, repeats):
+    fn()    # warm-up
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    p50, p90, p99 = np.percentile(times, [50, 90, 99])
+    return {"p50_ms": 1000 * p50, "p90_ms": 1000 * p90, "p99_ms": 1000 * p99, "min_ms": 1000 * min(times)}
+
+
+# every (filter, ksize, sigma) configuration of the sweep
+def filter_configs(ksizes, sigmas):
+    configs = []
+    for k in ksizes:
+        configs.append(("blur", k, 0))
+        configs.extend(("gaussian", k, sigma) for sigma in sigmas)
+        configs.append(("median", k, 0))
+    return configs
+
+
+def run_benchmark(image_path, scales, noises, ksizes, sigmas, repeats, seed=0):
+    clean_full = cv.imread(image_path)
+    if clean_full is None:
+        raise FileNotFoundError(image_path)
+
+    results = []
+    for scale in scales:
+        clean = cv.resize(clean_full, None, fx=scale, fy=scale, interpolation=cv.INTER_AREA)
+        pixels = clean.shape[0] * clean.shape[1]
+
+        for noise_name, level in noises:
+            rng = np.random.default_rng(seed)
+            noisy = NOISE_MODELS[noise_name](clean, level, rng)
+            baseline = {"psnr": psnr(clean, noisy), "ssim": ssim(clean, noisy)}
+
+            for kind, ksize, sigma in filter_configs(ksizes, sigmas):
+                denoised = apply_filter(noisy, kind, ksize, sigma)
+                timing = measure(lambda: apply_filter(noisy, kind, ksize, sigma), repeats)
+                results.append({
+                    "filter": kind,
+                    "ksize": ksize,
+                    "sigma": sigma,
+                    "width": clean.shape[1],
+                    "height": clean.shape[0],
+                    "noise": noise_name,
+                    "noise_level": level,
+                    "noisy_psnr": baseline["psnr"],
+                    "noisy_ssim": baseline["ssim"],
+                    "psnr": psnr(clean, denoised),
+                    "ssim": ssim(clean, denoised),
+                    **timing,
+                    "megapixels_per_s": pixels / 1e6 / (timing["p50_ms"] / 1000),
+                })
+                print(f"{clean.shape[1]}x{clean.shape[0]} {noise_name}={level:<5} {kind:>8} k={ksize} s={sigma:<4} "
+                      f"PSNR {results[-1]['psnr']:5.2f} SSIM {results[-1]['ssim']:.3f} p50 {timing['p50_ms']:7.2f} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Denoising quality vs. throughput benchmark.")
+    parser.add_argument("--image", default="cat1.png", help="clean reference image")
+    parser.add_argument("--output", default="denoise_benchmark.json", help="JSON results file")
+    parser.add_argument("--repeats", type=int, default=20, help="timed runs per configuration")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the synthetic noise")
+    parser.add_argument("--quick", action="store_true", help="small sweep for a fast check")
+    args = parser.parse_args()
+
+    if args.quick:
+        scales, ksizes, sigmas = [0.5], [3, 7], [0]
+        noises = [("gaussian", 25), ("salt_pepper", 0.05)]
+    else:
+        scales, ksizes, sigmas = [0.5, 1.0, 2.0], [3, 5, 7, 9], [0, 1, 3, 10]
+        noises = [("gaussian", 10), ("gaussian", 25), ("salt_pepper", 0.02), ("salt_pepper", 0.1)]
+
+    results = run_benchmark(args.image, scales, noises, ksizes, sigmas, args.repeats, args.seed)
+
+    report = {
+        "environment": {
+            "opencv": cv.__version__,
+            "numpy": np.__version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "opencv_threads": cv.getNumThreads(),
+        },
+        "settings": {"image": args.image, "repeats": args.repeats, "seed": args.seed},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+This module defines `load_image(path, dsize=None, scale=None, code=None)`, a cached version of
+`cv.imread` (+ optional `cv.resize` and `cv.cvtColor`).
+
+The first time an image is loaded, it is decoded and transformed as usual and the resulting NumPy array
+is saved as a `.npy` file. Later loads with the same file content and the same transform just memory-map
+that file, which is much cheaper than decoding a PNG/JPEG/WebP again.
+
+- Keys are a hash of the file content plus the transform parameters, so identical copies of an image
+  in different folders (e.g. cat1.png) share one cache entry, and editing an image invalidates it.
+- Entries are evicted least-recently-used first when the cache grows past `max_bytes`.
+- Returned arrays are copy-on-write memory maps: you can draw on them without changing the cache.
+- The cache lives in $OPENCV_WORKSHOP_CACHE (default: ~/.cache/opencv_workshop).
+"""
+
+import hashlib
+import os
+import tempfile
+
+import cv2 as cv
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.environ.get("OPENCV_WORKSHOP_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "opencv_workshop"))
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class ImageCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # hash of the file content + transform parameters
+    def _key(self, path, flags, dsize, scale, code, interpolation):
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        digest.update(repr((flags, dsize, scale, code, interpolation)).encode())
+        return digest.hexdigest()
+
+    def load(self, path, flags=cv.IMREAD_COLOR, dsize=None, scale=None, code=None, interpolation=cv.INTER_LINEAR):
+        if not os.path.exists(path):
+            return None     # same as cv.imread for a missing file
+
+        entry = os.path.join(self.cache_dir, self._key(path, flags, dsize, scale, code, interpolation) + ".npy")
+        try:
+            img = np.load(entry, mmap_mode="c")
+            os.utime(entry)     # mark as recently used
+            self.hits += 1
+            return img
+        except (FileNotFoundError, ValueError):
+            pass
+
+        # Cache miss: decode and transform as usual
+        self.misses += 1
+        img = cv.imread(path, flags)
+        if img is None:
+            return None
+        if scale is not None:
+            dsize = (int(img.shape[1] * scale), int(img.shape[0] * scale))
+        if dsize is not None:
+            img = cv.resize(src=img, dsize=tuple(dsize), interpolation=interpolation)
+        if code is not None:
+            img = cv.cvtColor(src=img, code=code)
+
+        # write to a temporary file first so a concurrent reader never sees a half-written entry
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, img)
+            os.replace(tmp, entry)
+        except BaseException as error:
+            # don't leave the temporary file behind (_evict only sees .npy entries, it would never go away)
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            if isinstance(error, OSError):
+                return img      # disk full / not writable: return the image uncached
+            raise
+        self._evict(keep=entry)
+        return img
+
+    # delete least recently used entries until the cache fits in max_bytes
+    def _evict(self, keep):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".npy"):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _mtime, size, _path in entries)
+        for _mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)     # an open memory map of this entry stays valid
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+_default_cache = None
+
+
+# cv.imread with a decoded-image cache (see the module docstring)
+def load_image(path, flags=cv.IMREAD_COLOR, dsize=None, scale=None, code=None, interpolation=cv.INTER_LINEAR):
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ImageCache()
+    return _default_cache.load(path, flags=flags, dsize=dsize, scale=scale, code=code, interpolation=interpolation)
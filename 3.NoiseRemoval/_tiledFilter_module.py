@@ -0,0 +1,90 @@
+"""
+This module applies the blurring filters from 1_blurring.py (cv.blur, cv.GaussianBlur, cv.medianBlur)
+tile by tile, for images too large to filter in one call.
+
+- Each tile is read with a "halo" of extra pixels around it, sized from the kernel (ksize // 2), so every
+  output pixel sees exactly the same neighbourhood as in the whole-image call. Tiles that touch the image
+  edge get the same border handling as before, so the result is bit-identical to the whole-image call.
+- Tiles run on a thread pool (OpenCV releases the GIL while filtering).
+- The tile size is chosen so that the tiles being processed at once fit in `max_memory` bytes.
+- The input and output can be memory-mapped `.npy` files (`np.load(path, mmap_mode="r")` and
+  `open_output(path, shape, dtype)`), so the full image never has to be in memory.
+
+Example:
+    img = np.load("scan.npy", mmap_mode="r")
+    out = open_output("scan_blurred.npy", img.shape, img.dtype)
+    tiled_filter(img, "gaussian", ksize=7, sigma=10, out=out, max_memory=256 * 1024 * 1024)
+"""
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2 as cv
+import numpy as np
+
+FILTERS = ("blur", "gaussian", "median")
+
+
+# memory-mapped .npy file to stream the filtered image into
+def open_output(path, shape, dtype):
+    return np.lib.format.open_memmap(path, mode="w+", shape=tuple(shape), dtype=dtype)
+
+
+# kernel (width, height) of a filter; GaussianBlur computes it from sigma when ksize is 0
+def kernel_size(kind, ksize, sigma=0, dtype=np.uint8):
+    if kind not in FILTERS:
+        raise ValueError(f"kind must be one of {FILTERS}, got {kind!r}")
+    kx, ky = (ksize, ksize) if np.isscalar(ksize) else ksize
+    if kind == "gaussian" and (kx <= 0 or ky <= 0):
+        # same formula as OpenCV's createGaussianKernels
+        radius = 3 if np.dtype(dtype) == np.uint8 else 4
+        if kx <= 0:
+            kx = int(round(sigma * radius * 2 + 1)) | 1
+        if ky <= 0:
+            ky = int(round(sigma * radius * 2 + 1)) | 1
+    return int(kx), int(ky)
+
+
+# the whole-image call that tiled_filter reproduces
+def apply_filter(img, kind, ksize, sigma=0):
+    if kind == "blur":
+        return cv.blur(src=img, ksize=kernel_size(kind, ksize))
+    if kind == "gaussian":
+        return cv.GaussianBlur(src=img, ksize=(ksize, ksize) if np.isscalar(ksize) else tuple(ksize), sigmaX=sigma)
+    return cv.medianBlur(src=img, ksize=int(ksize))
+
+
+def tiled_filter(img, kind, ksize, sigma=0, out=None, tile=None, workers=4, max_memory=256 * 1024 * 1024):
+    height, width = img.shape[:2]
+    kx, ky = kernel_size(kind, ksize, sigma, img.dtype)
+    halo_x, halo_y = kx // 2, ky // 2
+
+    if out is None:
+        out = np.empty_like(img)
+
+    if tile is None:
+        # every running tile holds its input (with halo), OpenCV's bordered copy of it and its output
+        pixel_bytes = img.itemsize * (img.shape[2] if img.ndim == 3 else 1)
+        per_worker = max_memory / (3 * pixel_bytes * max(1, workers))
+        tile = max(64, int(math.sqrt(per_worker)) - 2 * max(halo_x, halo_y))
+
+    tiles = [(y, x) for y in range(0, height, tile) for x in range(0, width, tile)]
+
+    def run(tile_origin):
+        y0, x0 = tile_origin
+        y1, x1 = min(y0 + tile, height), min(x0 + tile, width)
+
+        # tile + halo, clipped to the image (at the image edge OpenCV adds its usual border instead)
+        top, left = max(0, y0 - halo_y), max(0, x0 - halo_x)
+        bottom, right = min(height, y1 + halo_y), min(width, x1 + halo_x)
+
+        filtered = apply_filter(np.ascontiguousarray(img[top:bottom, left:right]), kind, ksize, sigma)
+        out[y0:y1, x0:x1] = filtered[y0 - top:y1 - top, x0 - left:x1 - left]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in pool.map(run, tiles):
+            pass
+
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
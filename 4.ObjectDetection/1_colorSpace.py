@@ -3,10 +3,11 @@ Demonstrating color space conversions in OpenCV, including BGR to RGB and graysc
 """
 
 import cv2 as cv
+from _imageCache_module import load_image  # cv.imread with a decoded-image cache
 
 
 # Read the image (default color space is BGR)
-img = cv.imread("cat1.png")
+img = load_image("cat1.png")  # decoded once, later runs memory-map the cached array
 
 # Convert color spaces
 rgb_img = cv.cvtColor(img, cv.COLOR_BGR2RGB)     # BGR to RGB
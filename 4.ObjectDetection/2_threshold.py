@@ -5,9 +5,10 @@
 """
 
 import cv2 as cv
+from _imageCache_module import load_image  # cv.imread with a decoded-image cache
 
 # Read the image
-img = cv.imread("cat1.png")
+img = load_image("cat1.png")  # decoded once, later runs memory-map the cached array
 
 # Convert the image to grayscale
 # Thresholding works on grayscale images, where each pixel has only intensity information.
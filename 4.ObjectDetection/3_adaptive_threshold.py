@@ -1,5 +1,6 @@
 import cv2 as cv
 import os
+from _imageCache_module import load_image  # cv.imread with a decoded-image cache
 
 # ================================
 # Adaptive Thresholding Example
@@ -12,7 +13,7 @@ import os
 # useul for OCR (opticall character recognition)
 
 # Read 
-img = cv.imread("note.webp")
+img = load_image("note.webp")  # decoded once, later runs memory-map the cached array
 
 # Convert the image to grayscale
 gray_img = cv.cvtColor(img, cv.COLOR_BGR2GRAY)
@@ -70,3 +71,8 @@ cv.destroyAllWindows()
 # 4. **Noise Reduction**:
 # - After thresholding, noise can appear due to minor pixel variations. 
 #   - In such cases, median blur or other filtering techniques can help remove noise and enhance the quality of the binary output.
+
+# 5. **Very large scans**:
+# - `_adaptiveThreshold_module.py` gives the same result as cv.adaptiveThreshold, computed in horizontal strips
+#   with integral images, so the cost per pixel doesn't grow with blockSize and only a few strips are in memory:
+#   th_img = adaptive_threshold(gray_img, 255, cv.ADAPTIVE_THRESH_GAUSSIAN_C, cv.THRESH_BINARY, 21, 30)
@@ -6,14 +6,12 @@
 
 import cv2 as cv
 import _Colors_module as c
+from _imageCache_module import load_image  # cv.imread with a decoded-image cache
 
 
-# Read 
-img = cv.imread("wb.png")
-# you may need to resize the img!
-
-# Resize Image
-img = cv.resize(src=img, dsize=(img.shape[1]//2, img.shape[0]//2))
+# Read and resize (you may need to resize the img!)
+# load_image caches the decoded + resized (half size) image, so later runs skip decoding and resizing
+img = load_image("wb.png", scale=0.5)
 
 # Shape of the image (height, width, channels)
 print(f"Image Shape: {img.shape}")
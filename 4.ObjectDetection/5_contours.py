@@ -2,13 +2,12 @@
 
 import _Colors_module as c
 import cv2 as cv
+from _imageCache_module import load_image  # cv.imread with a decoded-image cache
 
 
-# Read the image
-birds = cv.imread("birds.jpg")
-
-# Resize the image
-birds = cv.resize(src=birds, dsize=(650, 650))
+# Read and resize the image
+# (load_image caches the decoded + resized array, so later runs skip decoding and resizing)
+birds = load_image("birds.jpg", dsize=(650, 650))
 
 # Original Image after Resizing
 cv.imshow("Original Image", birds)
@@ -0,0 +1,62 @@
+# ================================
+# Demo - The contour detection chain as a reusable pipeline
+# ================================
+# 5_contours.py and 6_demo.py call each step by hand, and every step returns a new full-size image.
+# That is fine for one picture, but for a stream of images (video frames, a folder of photos) the same
+# chain runs again and again. _pipeline_module.py lets you declare the chain once:
+# 1. Each stage writes into its own buffer, which is reused for every later image of the same size.
+# 2. Gray + Threshold run as one fused step (cvtColor into a buffer, then one in-place threshold pass).
+# 3. The pipeline measures the time and the bytes allocated by every stage.
+
+import _Colors_module as c
+import cv2 as cv
+import numpy as np
+from _pipeline_module import FindContours, GaussianBlur, Gray, Pipeline, Resize, Threshold
+
+
+# ================================
+# Step 1: Declare the stages (same parameters as 6_demo.py)
+# ================================
+pipe = Pipeline([
+    Resize(dsize=(650, 650)),
+    Gray(),
+    Threshold(thresh=120, maxval=255, type=cv.THRESH_BINARY_INV),
+    GaussianBlur(ksize=(5, 5), sigmaX=1),
+    FindContours(mode=cv.RETR_EXTERNAL, method=cv.CHAIN_APPROX_SIMPLE),
+])
+print("Steps after fusion:", [step.name for step in pipe.steps])
+
+# ================================
+# Step 2: Run it on one image
+# ================================
+birds_full = cv.imread("birds.jpg")
+contours = pipe(birds_full)
+
+birds = pipe.last("Resize").copy()      # the pipeline's buffers are reused by the next call, so copy
+cv.drawContours(image=birds, contours=contours, contourIdx=-1, color=c.BLUE, thickness=3)
+cv.imshow("Detected Birds", birds)
+cv.imshow("Blurred Birds", pipe.last("GaussianBlur"))
+
+# ================================
+# Step 3: Run it on a stream of images
+# ================================
+# Here: the same photo with changing brightness, like frames of a video
+frames = (cv.convertScaleAbs(birds_full, alpha=1.0, beta=beta) for beta in np.linspace(-40, 40, 100))
+counts = [len(contours) for contours in pipe.run_batch(frames)]
+print(f"Contours per frame: min {min(counts)}, max {max(counts)}")
+
+# Per-stage time and allocations: the image buffers are allocated once, on the first frame
+print(pipe.format_report())
+
+cv.waitKey(0)
+cv.destroyAllWindows()
+
+
+# ================================
+# Notes:
+# ================================
+# 1. Results that are images (e.g. pipe.last("GaussianBlur")) are the pipeline's own buffers:
+#    copy them if you want to keep them after the next call, or use pipe.run_batch(images, copy=True).
+# 2. Any per-pixel 8-bit mapping can be added as Lut(table); consecutive Threshold / Lut stages are fused
+#    into a single pass.
+# 3. FindContours still allocates its point arrays on every call (OpenCV creates them), which the report shows.
@@ -0,0 +1,79 @@
+"""
+This module computes the usual per-contour measurements (area, bounding box, centroid, perimeter) for
+ALL contours at once with NumPy, instead of calling cv.contourArea / cv.boundingRect / cv.moments /
+cv.arcLength in a Python loop once per contour.
+
+All contour points are joined into one array and every measurement is a sum / min / max over each
+contour's slice of it (`np.add.reduceat` and friends), so thousands of contours cost about as much as a
+single big one.
+
+Results match OpenCV:
+- areas:       cv.contourArea(cnt)            (shoelace formula)
+- boxes:       cv.boundingRect(cnt)           (x, y, w, h)
+- centroids:   (m10 / m00, m01 / m00) of cv.moments(cnt), or the mean point for zero-area contours
+- perimeters:  cv.arcLength(cnt, closed=True)
+
+Filtering is done with a boolean mask, e.g. `keep = stats["areas"] > 200`.
+"""
+
+import cv2 as cv
+import numpy as np
+
+
+# Find contours without building a hierarchy unless it is needed:
+# - outer_only=True:  cv.RETR_EXTERNAL (outer shapes only, fastest)
+# - outer_only=False: cv.RETR_LIST (all contours, no hierarchy)
+def find_contours(binary_img, outer_only=True, method=cv.CHAIN_APPROX_SIMPLE):
+    mode = cv.RETR_EXTERNAL if outer_only else cv.RETR_LIST
+    contours, _hierarchy = cv.findContours(image=binary_img, mode=mode, method=method)
+    return contours
+
+
+def contour_stats(contours):
+    count = len(contours)
+    if count == 0:
+        return {
+            "areas": np.zeros(0),
+            "boxes": np.zeros((0, 4), dtype=np.int32),
+            "centroids": np.zeros((0, 2)),
+            "perimeters": np.zeros(0),
+        }
+
+    # one (N, 2) array of every point, and where each contour starts in it
+    lengths = np.fromiter((len(cnt) for cnt in contours), dtype=np.int64, count=count)
+    points = np.concatenate(contours).reshape(-1, 2)
+    starts = np.zeros(count, dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+
+    # index of the next point of the same (closed) contour
+    following = np.arange(1, len(points) + 1)
+    following[starts + lengths - 1] = starts
+
+    x, y = points[:, 0].astype(np.float64), points[:, 1].astype(np.float64)
+    x_next, y_next = x[following], y[following]
+
+    # Area (shoelace formula): twice the signed area is the sum of cross products of consecutive points
+    cross = x * y_next - x_next * y
+    twice_area = np.add.reduceat(cross, starts)
+    areas = np.abs(twice_area) / 2
+
+    # Centroid of the polygon, falling back to the mean point when the area is 0 (lines, single points)
+    mean_x = np.add.reduceat(x, starts) / lengths
+    mean_y = np.add.reduceat(y, starts) / lengths
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cx = np.add.reduceat((x + x_next) * cross, starts) / (3 * twice_area)
+        cy = np.add.reduceat((y + y_next) * cross, starts) / (3 * twice_area)
+    flat = twice_area == 0
+    centroids = np.column_stack([np.where(flat, mean_x, cx), np.where(flat, mean_y, cy)])
+
+    # Perimeter: length of every segment, including the closing one
+    perimeters = np.add.reduceat(np.hypot(x_next - x, y_next - y), starts)
+
+    # Bounding box (x, y, w, h) like cv.boundingRect: w and h count pixels, so max - min + 1
+    x_min = np.minimum.reduceat(points[:, 0], starts)
+    y_min = np.minimum.reduceat(points[:, 1], starts)
+    x_max = np.maximum.reduceat(points[:, 0], starts)
+    y_max = np.maximum.reduceat(points[:, 1], starts)
+    boxes = np.column_stack([x_min, y_min, x_max - x_min + 1, y_max - y_min + 1]).astype(np.int32)
+
+    return {"areas": areas, "boxes": boxes, "centroids": centroids, "perimeters": perimeters}
@@ -0,0 +1,284 @@
+"""
+This module lets you declare the object-detection chain of 5_contours.py / 6_demo.py
+(resize -> gray -> threshold -> Gaussian blur -> findContours) once, and run it over single images or a
+stream / batch of images.
+
+Compared with calling the cv functions one after the other:
+- Every stage writes into its own output buffer (`dst=`), allocated on the first call and reused for every
+  later image of the same size, so a stream of images does not allocate new full-size arrays per frame.
+- Adjacent pointwise stages on 8-bit images (Threshold, Lut) are fused: their 256-entry lookup tables are
+  composed into one table and applied in a single pass, in place on the previous stage's buffer.
+  When the composed table is itself a plain threshold (e.g. Threshold + inversion), the pass is done by
+  cv.threshold, which is much faster than cv.LUT; any other table is applied with cv.LUT.
+  E.g. Gray + Threshold becomes one cvtColor into a buffer plus one in-place threshold pass over it.
+- The pipeline records, per stage, the number of calls, the time spent and the bytes it allocated
+  (`report()` / `format_report()`), so you can see where the time goes and check that nothing is allocated
+  once the buffers are warm.
+
+Example:
+    pipe = Pipeline([Gray(), Threshold(120, 255, cv.THRESH_BINARY_INV), GaussianBlur((5, 5), 1), FindContours()])
+    contours = pipe(birds)
+    blurred = pipe.last("GaussianBlur")
+    print(pipe.format_report())
+
+Note: array results are the pipeline's own buffers and are overwritten by the next call. Copy them (or use
+`run_batch(images, copy=True)`) if you need to keep them.
+"""
+
+import math
+import time
+from functools import reduce
+
+import cv2 as cv
+import numpy as np
+
+_THRESHOLD_TYPES = (cv.THRESH_BINARY, cv.THRESH_BINARY_INV, cv.THRESH_TRUNC, cv.THRESH_TOZERO, cv.THRESH_TOZERO_INV)
+
+
+# ================================
+# Stages
+# ================================
+# A stage has a name, apply(src, dst) -> output (dst may be None or the buffer from the previous call),
+# and pointwise stages also have table() -> 256-entry uint8 lookup table giving the same result on 8-bit input.
+class Resize:
+    pointwise = False
+
+    def __init__(self, dsize=None, fx=0, fy=0, interpolation=cv.INTER_LINEAR):
+        self.name = "Resize"
+        self.dsize, self.fx, self.fy, self.interpolation = dsize, fx, fy, interpolation
+
+    def apply(self, src, dst):
+        return cv.resize(src, self.dsize, dst=dst, fx=self.fx, fy=self.fy, interpolation=self.interpolation)
+
+
+class Gray:
+    pointwise = False
+
+    def __init__(self, code=cv.COLOR_BGR2GRAY):
+        self.name = "Gray"
+        self.code = code
+
+    def apply(self, src, dst):
+        return cv.cvtColor(src, self.code, dst=dst)
+
+
+class Threshold:
+    def __init__(self, thresh, maxval=255, type=cv.THRESH_BINARY):
+        self.name = "Threshold"
+        self.thresh, self.maxval, self.type = thresh, maxval, type
+        # Otsu / triangle pick the threshold from each image's histogram, so they cannot be a fixed table
+        self.pointwise = type in _THRESHOLD_TYPES
+
+    def apply(self, src, dst):
+        _, out = cv.threshold(src, self.thresh, self.maxval, self.type, dst=dst)
+        return out
+
+    # same result as cv.threshold on 8-bit images (it compares against the integer part of thresh)
+    def table(self):
+        values = np.arange(256)
+        t = min(max(math.floor(self.thresh), -1), 255)
+        maxval = min(max(round(self.maxval), 0), 255)
+        above = values > t
+        table = {
+            cv.THRESH_BINARY: np.where(above, maxval, 0),
+            cv.THRESH_BINARY_INV: np.where(above, 0, maxval),
+            cv.THRESH_TRUNC: np.where(above, max(t, 0), values),
+            cv.THRESH_TOZERO: np.where(above, values, 0),
+            cv.THRESH_TOZERO_INV: np.where(above, 0, values),
+        }[self.type]
+        return table.astype(np.uint8)
+
+
+# any per-pixel 8-bit mapping (gamma, levels, inversion, ...) as a 256-entry table
+class Lut:
+    pointwise = True
+
+    def __init__(self, table, name="Lut"):
+        self.name = name
+        self.lut = np.asarray(table, dtype=np.uint8).reshape(256)
+
+    def apply(self, src, dst):
+        return cv.LUT(src, self.lut, dst=dst)
+
+    def table(self):
+        return self.lut
+
+
+class GaussianBlur:
+    pointwise = False
+
+    def __init__(self, ksize, sigmaX, sigmaY=0, borderType=cv.BORDER_DEFAULT):
+        self.name = "GaussianBlur"
+        self.ksize, self.sigmaX, self.sigmaY, self.borderType = tuple(ksize), sigmaX, sigmaY, borderType
+
+    def apply(self, src, dst):
+        return cv.GaussianBlur(src, self.ksize, self.sigmaX, dst=dst, sigmaY=self.sigmaY, borderType=self.borderType)
+
+
+# last stage: returns the list of contours (cv.RETR_EXTERNAL by default, see _contourStats_module.py)
+class FindContours:
+    pointwise = False
+
+    def __init__(self, mode=cv.RETR_EXTERNAL, method=cv.CHAIN_APPROX_SIMPLE):
+        self.name = "FindContours"
+        self.mode, self.method = mode, method
+
+    def apply(self, src, dst):
+        contours, _hierarchy = cv.findContours(src, self.mode, self.method)
+        return contours
+
+
+# A stage followed by pointwise stages (or pointwise stages alone), run as the stage plus one LUT pass
+class _Fused:
+    pointwise = False
+
+    def __init__(self, base, pointwise_stages):
+        self.base = base
+        self.stages = pointwise_stages
+        self.name = "+".join(stage.name for stage in ([base] if base else []) + pointwise_stages)
+        # composed table: applying it once equals applying every stage's table in order
+        self.lut = reduce(lambda lut, stage: stage.table()[lut], pointwise_stages, np.arange(256, dtype=np.uint8))
+        self.threshold = _as_threshold(self.lut)
+
+    def apply(self, src, dst):
+        if self.base is not None:
+            dst = self.base.apply(src, dst)
+            src = dst
+        if src.dtype != np.uint8:
+            # tables only describe 8-bit images: run the stages one by one
+            for stage in self.stages:
+                dst = stage.apply(src, dst)
+                src = dst
+            return dst
+        # in place on the base stage's buffer (or into our own buffer when the chain starts the pipeline)
+        if self.threshold is not None:
+            return self.threshold.apply(src, dst)
+        return cv.LUT(src, self.lut, dst=dst)
+
+
+# the Threshold stage whose table equals lut, or None
+def _as_threshold(lut):
+    values = np.arange(256)
+    thresholds = np.arange(-1, 256)[:, None]      # every distinct integer threshold
+    above = values > thresholds
+    maxval = int(lut.max())
+    candidates = {
+        cv.THRESH_BINARY: np.where(above, maxval, 0),
+        cv.THRESH_BINARY_INV: np.where(above, 0, maxval),
+        cv.THRESH_TRUNC: np.where(above, np.maximum(thresholds, 0), values),
+        cv.THRESH_TOZERO: np.where(above, values, 0),
+        cv.THRESH_TOZERO_INV: np.where(above, 0, values),
+    }
+    for type, tables in candidates.items():
+        matches = np.flatnonzero((tables == lut).all(axis=1))
+        if len(matches):
+            return Threshold(int(thresholds[matches[0], 0]), maxval, type)
+    return None
+
+
+class Pipeline:
+    def __init__(self, stages, fuse=True):
+        self.stages = list(stages)
+        self.steps = self._fuse(self.stages) if fuse else self.stages
+        self._buffers = [None] * len(self.steps)
+        self._outputs = [None] * len(self.steps)
+        self.reset_stats()
+
+    @staticmethod
+    def _fuse(stages):
+        steps = []
+        i = 0
+        while i < len(stages):
+            stage = stages[i]
+            base = None if stage.pointwise else stage
+            j = i if stage.pointwise else i + 1
+            run = []
+            while j < len(stages) and stages[j].pointwise:
+                run.append(stages[j])
+                j += 1
+            steps.append(_Fused(base, run) if run else stage)
+            i = j
+        return steps
+
+    def reset_stats(self):
+        self.stats = [{"stage": step.name, "calls": 0, "seconds": 0.0, "allocations": 0, "bytes_allocated": 0}
+                      for step in self.steps]
+
+    # run every stage on one image and return the last stage's output
+    def __call__(self, img):
+        data = img
+        for i, step in enumerate(self.steps):
+            buffer = self._buffers[i]
+            start = time.perf_counter()
+            out = step.apply(data, buffer)
+            elapsed = time.perf_counter() - start
+
+            stats = self.stats[i]
+            stats["calls"] += 1
+            stats["seconds"] += elapsed
+            if isinstance(out, np.ndarray):
+                if out is not buffer:
+                    # first call, or the size changed: OpenCV allocated a new array, keep it for next time
+                    self._buffers[i] = out
+                    stats["allocations"] += 1
+                    stats["bytes_allocated"] += out.nbytes
+            elif isinstance(out, (list, tuple)):
+                # contours: new point arrays every call
+                stats["allocations"] += len(out)
+                stats["bytes_allocated"] += sum(part.nbytes for part in out)
+
+            self._outputs[i] = out
+            data = out
+        return data
+
+    # run over many images; results share the pipeline's buffers unless copy=True
+    def run_batch(self, images, copy=False):
+        for img in images:
+            out = self(img)
+            yield out.copy() if copy and isinstance(out, np.ndarray) else out
+
+    # output of the (last) step containing the stage with this name, from the last call
+    def last(self, name):
+        for step, out in zip(reversed(self.steps), reversed(self._outputs)):
+            if name in step.name.split("+"):
+                return out
+        raise KeyError(name)
+
+    def report(self):
+        rows = []
+        for stats in self.stats:
+            calls = max(stats["calls"], 1)
+            rows.append({**stats, "total_ms": 1000 * stats["seconds"], "mean_ms": 1000 * stats["seconds"] / calls,
+                         "bytes_per_call": stats["bytes_allocated"] / calls})
+        return rows
+
+    def format_report(self):
+        lines = [f"{'stage':<28}{'calls':>7}{'mean ms':>10}{'total ms':>11}{'allocs':>8}{'bytes':>12}"]
+        for row in self.report():
+            lines.append(f"{row['stage']:<28}{row['calls']:>7}{row['mean_ms']:>10.3f}{row['total_ms']:>11.1f}"
+                         f"{row['allocations']:>8}{row['bytes_allocated']:>12}")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Stream benchmark: the hand-written chain of 6_demo.py against the pipeline, on 1080p frames
+    rng = np.random.default_rng(0)
+    frames = [cv.GaussianBlur(rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8), (0, 0), 4) for _ in range(8)]
+    runs = 200
+
+    def by_hand(img):
+        gray = cv.cvtColor(img, cv.COLOR_BGR2GRAY)
+        _, th = cv.threshold(gray, 120, 255, cv.THRESH_BINARY_INV)
+        blurred = cv.GaussianBlur(th, (5, 5), 1)
+        contours, _ = cv.findContours(blurred, cv.RETR_EXTERNAL, cv.CHAIN_APPROX_SIMPLE)
+        return contours
+
+    pipe = Pipeline([Gray(), Threshold(120, 255, cv.THRESH_BINARY_INV), GaussianBlur((5, 5), 1), FindContours()])
+    assert len(pipe(frames[0])) == len(by_hand(frames[0]))
+
+    for name, fn in (("by hand", by_hand), ("pipeline", pipe)):
+        start = time.perf_counter()
+        for i in range(runs):
+            fn(frames[i % len(frames)])
+        print(f"{name:>9}: {1000 * (time.perf_counter() - start) / runs:.2f} ms/frame")
+    print(pipe.format_report())
@@ -0,0 +1,72 @@
+import cv2 as cv
+from _frameGrabber_module import FrameGrabber
+from _framePool_module import FramePool
+from _recording_module import source_from_argv
+from _stageTimer_module import StageTimer
+
+# ================================
+# Threaded Webcam Capture
+# ================================
+# Same as 1_webcam.py, but frames are read on a background thread by FrameGrabber.
+# The loop always gets the newest frame, so slow processing never falls further and further behind live.
+
+# Webcam 0, or the source given on the command line: a webcam index, a video file or a recording made with
+# 3_record.py (`python 2_threaded_webcam.py session/ --fast` replays every recorded frame as fast as possible)
+source, mode = source_from_argv(default=0)
+
+# Initialize the webcam through the grabber (mode="latest" drops stale frames, mode="all" keeps every frame)
+# reuse_frames=True decodes into a few recycled arrays instead of a new array per frame
+webcam = FrameGrabber(source, mode=mode, reuse_frames=True)
+
+# Preallocated output buffers for the loop (allocated on the first frame, reused afterwards)
+pool = FramePool()
+
+# Per-stage timings (FPS and p50 / p95 / p99 per stage); press 't' to show / hide them on the frame
+timer = StageTimer()
+show_timings = True
+
+while True:
+    # Get the newest frame (same return value as webcam.read() in 1_webcam.py)
+    with timer.stage("capture"):
+        ret, frame = webcam.read()
+    if not ret:
+        break
+
+    # Flip the frame horizontally (mirror effect), into a reused buffer
+    with timer.stage("flip"):
+        frame = cv.flip(src=frame, flipCode=1, dst=pool.like("flip", frame))
+
+    if show_timings:
+        timer.draw(frame)
+
+    with timer.stage("display"):
+        cv.imshow("webcam", frame)
+        key = cv.waitKey(1) & 0xFF
+    timer.frame()
+
+    # Exit the loop if 'q' is pressed
+    if key == ord("q"):
+        break
+    if key == ord("t"):
+        show_timings = not show_timings
+
+# Stop the capture thread, release the webcam and close the window
+webcam.release()
+cv.destroyAllWindows()
+
+# ================================
+# Notes:
+# ================================
+# - **webcam.read()** with cv.VideoCapture blocks until the camera delivers the next frame, so capture
+#   time is added to every loop iteration.
+# - **FrameGrabber** reads in the background and keeps only a few frames in a ring buffer.
+#   Check `webcam.dropped` to see how many stale frames were skipped.
+# - Run `python _frameGrabber_module.py` for a headless benchmark using synthetic frames.
+# - **FramePool** + `dst=`: cv.flip writes into the same buffer every frame, so after the first frame the loop
+#   allocates no new arrays (no allocator / garbage-collector spikes). `pool.allocations` stays at 1.
+#   Run `python _framePool_module.py` to measure it with AllocationMonitor.
+# - **StageTimer**: `with timer.stage(name):` around each step gives rolling p50 / p95 / p99 latencies per stage,
+#   drawn on the frame by `timer.draw(frame)`. `StageTimer(dump_path="timings.csv")` also writes them to a file
+#   every few seconds (.csv, .jsonl or .json).
+# - **Recordings**: record a session once with 3_record.py and pass its directory to any of the loops in
+#   5.Video, 6.ColorDetection and 7.HandDetection to compare timings on exactly the same frames.
@@ -0,0 +1,62 @@
+import argparse
+
+import cv2 as cv
+from _frameGrabber_module import FrameGrabber
+from _recording_module import Recorder
+
+# ================================
+# Record a Webcam Session for Replay
+# ================================
+# Saves every webcam frame with its capture time, so the loops in 5.Video, 6.ColorDetection and
+# 7.HandDetection can later be run on exactly the same frames:
+#
+#     python 3_record.py session/ --seconds 20
+#     python ../6.ColorDetection/2_color_detection.py session/          # replay at the recorded speed
+#     python ../6.ColorDetection/2_color_detection.py session/ --fast   # every frame, as fast as possible
+
+parser = argparse.ArgumentParser(description="Record webcam frames and timestamps for replay")
+parser.add_argument("output", help="directory for the recording")
+parser.add_argument("--codec", choices=["raw", "png"], default="raw",
+                    help="raw: fastest to write and replay; png: lossless, several times smaller")
+parser.add_argument("--seconds", type=float, default=None, help="stop after this many seconds (default: 'q')")
+parser.add_argument("--camera", type=int, default=0, help="webcam index")
+args = parser.parse_args()
+
+# mode="all": every captured frame is recorded, none are dropped when writing falls behind for a moment
+webcam = FrameGrabber(args.camera, mode="all", buffer_size=30)
+
+start = None
+with Recorder(args.output, codec=args.codec) as recorder:
+    while True:
+        ret, frame = webcam.read(timeout=2.0)
+        if not ret:
+            break
+
+        # Store the frame with the time it was captured (not the time it was read from the buffer)
+        recorder.write(frame, timestamp=webcam.lastTimestamp)
+        if start is None:
+            start = webcam.lastTimestamp
+
+        # Show a mirrored copy (the recorded frame stays unchanged)
+        preview = cv.flip(frame, 1)
+        cv.putText(preview, f"REC {len(recorder)}", (10, 30), cv.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2, cv.LINE_AA)
+        cv.imshow("recording", preview)
+        if cv.waitKey(1) & 0xFF == ord("q"):
+            break
+        if args.seconds is not None and webcam.lastTimestamp - start >= args.seconds:
+            break
+
+webcam.release()
+cv.destroyAllWindows()
+print(f"recorded {len(recorder)} frames to {args.output} ({webcam.dropped} dropped by the grabber)")
+
+# ================================
+# Notes:
+# ================================
+# - The recording is a directory: frames.bin (the frames), index.npy (timestamp, offset and size per frame)
+#   and meta.json (shape, codec, FPS). Raw frames are replayed through a memory map, so replay costs almost
+#   nothing; 640x480 raw is ~0.9 MB per frame (~28 MB/s at 30 FPS), png is lossless and much smaller.
+# - Pass the directory wherever a webcam index is accepted (FrameGrabber opens it like a video file).
+#   Without --fast a replay runs at the recorded speed and "latest" loops drop frames like they would live,
+#   which depends on timing; use --fast for before / after comparisons (identical input every run).
+# - Run `python _recording_module.py` to compare the two codecs on synthetic frames.
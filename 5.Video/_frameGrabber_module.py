@@ -0,0 +1,238 @@
+"""
+This module defines `FrameGrabber`, a drop-in replacement for `cv.VideoCapture` that reads frames
+on a background thread into a small ring buffer. Processing then runs at its own rate instead of
+waiting on the blocking `read()` call every iteration.
+
+Modes:
+- "latest": Only the newest frame matters. Older frames are dropped when the loop falls behind,
+  so what you process is always close to live (webcam, games, hand detection).
+- "all": Every frame is kept. The reader thread waits when the buffer is full (video files, recording).
+
+Sources:
+- int: webcam index (e.g. 0)
+- str: path to a video file, or to a recording directory (see _recording_module.py), replayed at its
+  recorded speed
+- a VideoCapture-like object with `read()` and `release()`
+- a generator / iterator or a function returning frames (None ends the stream), e.g. `synthetic_source()`
+  for headless benchmarking without a camera.
+If the source raises, the stream ends: `read()` returns the frames already buffered, then raises a RuntimeError
+(once, with the source's exception as its cause and in `error`), and `ended()` is True.
+
+reuse_frames=True (webcam / video file / replay sources): frames are decoded into a fixed set of preallocated arrays
+(`VideoCapture.read(image)`) instead of a new array per frame. A frame returned by `read()` then stays valid
+only until the next `read()` call, so copy it if you keep it (see _framePool_module.py for the other
+buffers of a loop).
+"""
+
+import threading
+import time
+from collections import deque
+
+import cv2 as cv
+import numpy as np
+from _recording_module import ReplaySource, is_recording
+
+
+class FrameGrabber:
+    def __init__(self, source=0, mode="latest", buffer_size=4, fps=None, loop=False, reuse_frames=False):
+        if mode not in ("latest", "all"):
+            raise ValueError(f"mode must be 'latest' or 'all', got {mode!r}")
+
+        self.source = source
+        self.mode = mode
+        self.buffer_size = max(1, int(buffer_size))
+        self.fps = fps      # pace non-webcam sources (None = as fast as possible)
+        self.loop = loop    # restart video files / replays when they end
+        self.reuse_frames = reuse_frames
+
+        # Statistics
+        self.grabbed = 0
+        self.dropped = 0
+        self.lastTimestamp = None   # capture time (time.perf_counter) of the last frame returned by read()
+
+        self._cap, self._next = self._openSource(source)
+        self._buffer = deque()
+        self._free = []     # recycled frame arrays (reuse_frames=True)
+        self._held = None   # frame returned by the last read(), recycled on the next one
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._finished = False
+        self.error = None   # exception that stopped the reader thread (raised by read() once the buffer is empty)
+        self._errorRaised = False
+
+        self._thread = threading.Thread(target=self._run, name="FrameGrabber", daemon=True)
+        self._thread.start()
+
+    # open the source and return (capture object or None, function returning the next frame or None)
+    def _openSource(self, source):
+        if is_recording(source):
+            cap = ReplaySource(source, realtime=True)
+        elif isinstance(source, (int, str)):
+            cap = cv.VideoCapture(source)
+        elif hasattr(source, "read"):
+            cap = source
+        else:
+            cap = None
+
+        # only cv.VideoCapture and replays can read into a given array (reuse_frames)
+        self._readsInto = isinstance(cap, (cv.VideoCapture, ReplaySource))
+
+        if cap is not None:
+            def nextFrame(image=None):
+                ret, frame = cap.read(image) if image is not None else cap.read()
+                return frame if ret else None
+            return cap, nextFrame
+
+        if callable(source):
+            return None, lambda image=None: source()
+
+        iterator = iter(source)
+        return None, lambda image=None: next(iterator, None)
+
+    # give a frame array back for reuse (caller holds self._cond)
+    def _recycle(self, frame):
+        if self.reuse_frames and self._readsInto and frame is not None:
+            self._free.append(frame)
+
+    # start a file / replay source from the beginning again (used with loop=True)
+    def _rewind(self):
+        if self._cap is not None and hasattr(self._cap, "set"):
+            return self._cap.set(cv.CAP_PROP_POS_FRAMES, 0)
+        return False
+
+    # background thread: grab frames and push them into the ring buffer
+    def _run(self):
+        interval = 1.0 / self.fps if self.fps else 0.0
+        nextTime = time.perf_counter()
+
+        try:
+            while not self._stopped:
+                slot = None
+                if self._free:
+                    with self._cond:
+                        slot = self._free.pop() if self._free else None
+
+                # decode into a recycled array (if the size changed, OpenCV returns a new one and the slot is dropped)
+                frame = self._next(slot)
+                if frame is None:
+                    with self._cond:
+                        self._recycle(slot)
+                    if self.loop and self._rewind():
+                        continue
+                    break
+
+                if interval:
+                    nextTime += interval
+                    delay = nextTime - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                with self._cond:
+                    if self.mode == "all":
+                        # Every frame mode: wait for the consumer instead of dropping
+                        while len(self._buffer) >= self.buffer_size and not self._stopped:
+                            self._cond.wait()
+                    elif len(self._buffer) == self.buffer_size:
+                        # Latest frame mode: drop the oldest frame
+                        self._recycle(self._buffer.popleft()[1])
+                        self.dropped += 1
+
+                    self._buffer.append((time.perf_counter(), frame))
+                    self.grabbed += 1
+                    self._cond.notify_all()
+        except Exception as error:
+            # a failing source (cv.error, corrupt recording, generator raising) ends the stream instead of
+            # leaving read() waiting forever; the error is kept for read() to raise
+            self.error = error
+        finally:
+            with self._cond:
+                self._finished = True
+                self._cond.notify_all()
+
+    # Same return value as cv.VideoCapture.read(): (ret, frame)
+    def read(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._buffer or self._finished, timeout):
+                return False, None
+            if not self._buffer:
+                if self.error is not None and not self._errorRaised:
+                    self._errorRaised = True     # raised once, later reads just return False
+                    raise RuntimeError(f"frame source failed: {self.error!r}") from self.error
+                return False, None
+
+            if self.mode == "latest":
+                # take the newest frame and throw away the stale ones
+                timestamp, frame = self._buffer.pop()
+                self.dropped += len(self._buffer)
+                for _timestamp, stale in self._buffer:
+                    self._recycle(stale)
+                self._buffer.clear()
+            else:
+                timestamp, frame = self._buffer.popleft()
+                self._cond.notify_all()     # wake the reader thread if it was waiting for space
+
+            # the caller is done with the previous frame now
+            self._recycle(self._held)
+            self._held = frame
+
+        self.lastTimestamp = timestamp
+        return True, frame
+
+    # True once the source has no more frames and every buffered frame has been read
+    def ended(self):
+        with self._cond:
+            return self._finished and not self._buffer
+
+    def isOpened(self):
+        if self._finished and self.error is not None:
+            return bool(self._buffer)      # the source failed: closed once its buffered frames are read
+        if self._cap is not None and hasattr(self._cap, "isOpened"):
+            return self._cap.isOpened()
+        return not self._finished or bool(self._buffer)
+
+    def release(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+        if self._cap is not None and hasattr(self._cap, "release"):
+            self._cap.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+# Synthetic frames (a moving square) for benchmarking without a webcam
+def synthetic_source(width=640, height=480, num_frames=None):
+    frame_id = 0
+    while num_frames is None or frame_id < num_frames:
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        x = (frame_id * 8) % max(1, width - 80)
+        cv.rectangle(frame, (x, height // 2 - 40), (x + 80, height // 2 + 40), (0, 255, 255), -1)
+        yield frame
+        frame_id += 1
+
+
+# Headless benchmark: a 60 FPS synthetic camera read by a loop that takes 25 ms per frame
+if __name__ == "__main__":
+    for mode in ("latest", "all"):
+        grabber = FrameGrabber(synthetic_source(num_frames=180), mode=mode, fps=60)
+        processed = 0
+        latencies = []
+        start = time.perf_counter()
+
+        while True:
+            ret, frame = grabber.read()
+            if not ret:
+                break
+            time.sleep(0.025)   # simulate processing
+            latencies.append(time.perf_counter() - grabber.lastTimestamp)
+            processed += 1
+
+        elapsed = time.perf_counter() - start
+        grabber.release()
+        print(f"{mode:>6}: processed {processed} frames in {elapsed:.2f}s, dropped {grabber.dropped}, "
+              f"mean latency {1000 * sum(latencies) / len(latencies):.1f} ms")
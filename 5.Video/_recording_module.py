@@ -0,0 +1,248 @@
+"""
+This module records a capture session to disk and replays it, so the live scripts can be measured on
+exactly the same frames every time (before / after a change, on another machine, without a webcam).
+
+Recording format: a directory with
+- frames.bin: the frames one after the other, either raw pixels (codec="raw", read back through a memory map,
+  no decoding cost) or PNG-compressed (codec="png", lossless, typically several times smaller)
+- index.npy:  one row per frame: timestamp (seconds since the first frame), byte offset and size in frames.bin
+- meta.json:  frame shape, dtype, codec, number of frames and average FPS
+
+`Recorder(path)` writes a session frame by frame (`write(frame, timestamp)`), `ReplaySource(path)` reads it
+back with the same interface as `cv.VideoCapture` (`read()`, `release()`, `isOpened()`, `set(CAP_PROP_POS_FRAMES)`):
+- realtime=True:  frames are returned at the recorded timestamps (like the camera did)
+- realtime=False: as fast as the loop asks for them (benchmarks)
+
+FrameGrabber opens a recording directory like a video file, so every loop that uses FrameGrabber can replay
+one. `source_from_argv()` lets a script take a webcam index, a video file or a recording on the command line:
+
+    python 2_color_detection.py                    # webcam 0
+    python 2_color_detection.py session/           # replay at recorded speed
+    python 2_color_detection.py session/ --fast    # replay every frame, as fast as possible
+
+For before / after comparisons use --fast: every frame is processed, so both runs see identical input
+(at recorded speed, a slower loop would drop different frames).
+"""
+
+import json
+import os
+import sys
+import time
+
+import cv2 as cv
+import numpy as np
+
+_INDEX_DTYPE = np.dtype([("timestamp", np.float64), ("offset", np.int64), ("size", np.int64)])
+
+
+def is_recording(path):
+    return isinstance(path, str) and os.path.isfile(os.path.join(path, "meta.json"))
+
+
+class Recorder:
+    def __init__(self, path, codec="raw", png_compression=1):
+        if codec not in ("raw", "png"):
+            raise ValueError(f"codec must be 'raw' or 'png', got {codec!r}")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.codec = codec
+        self.png_compression = png_compression      # 0-9, higher is smaller and slower
+
+        self.shape = None
+        self.dtype = None
+        self._index = []
+        self._offset = 0
+        self._start = None
+        self._file = open(os.path.join(path, "frames.bin"), "wb")
+
+    # add a frame; timestamp in seconds (e.g. FrameGrabber.lastTimestamp), default: now
+    def write(self, frame, timestamp=None):
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if self._start is None:
+            self._start = timestamp
+            self.shape, self.dtype = frame.shape, frame.dtype
+        elif frame.shape != self.shape or frame.dtype != self.dtype:
+            raise ValueError(f"frame {frame.shape} {frame.dtype} differs from the recording's {self.shape} {self.dtype}")
+
+        if self.codec == "raw":
+            data = memoryview(np.ascontiguousarray(frame)).cast("B")
+        else:
+            ok, data = cv.imencode(".png", frame, [cv.IMWRITE_PNG_COMPRESSION, self.png_compression])
+            if not ok:
+                raise RuntimeError("PNG encoding failed")
+        self._file.write(data)
+        self._index.append((timestamp - self._start, self._offset, len(data)))
+        self._offset += len(data)
+
+    def __len__(self):
+        return len(self._index)
+
+    # write the index and metadata; the recording is only readable after this
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        index = np.array(self._index, dtype=_INDEX_DTYPE)
+        np.save(os.path.join(self.path, "index.npy"), index)
+
+        duration = float(index["timestamp"][-1]) if len(index) else 0.0
+        meta = {
+            "version": 1,
+            "codec": self.codec,
+            "shape": list(self.shape) if self.shape else None,
+            "dtype": str(np.dtype(self.dtype)) if self.dtype else None,
+            "frames": len(index),
+            "duration": duration,
+            "fps": (len(index) - 1) / duration if duration > 0 else None,
+            "bytes": self._offset,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplaySource:
+    def __init__(self, path, realtime=True, loop=False):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self.codec = self.meta["codec"]
+        self.shape = tuple(self.meta["shape"] or ())
+        self.dtype = np.dtype(self.meta["dtype"] or np.uint8)
+
+        self.index = np.load(os.path.join(path, "index.npy"))
+        frames_path = os.path.join(path, "frames.bin")
+        if len(self.index) == 0:
+            self._data = None
+        elif self.codec == "raw":
+            # every frame is a slice of the memory map, no decoding
+            self._data = np.memmap(frames_path, dtype=self.dtype, mode="r", shape=(len(self.index),) + self.shape)
+        else:
+            self._data = np.memmap(frames_path, dtype=np.uint8, mode="r")
+
+        self.position = 0
+        self._startTime = None
+        self._opened = True
+
+    def __len__(self):
+        return len(self.index)
+
+    def isOpened(self):
+        return self._opened
+
+    # same as VideoCapture.read(): (ret, frame). With image, the frame is copied into it (no new array).
+    def read(self, image=None):
+        if not self._opened or self._data is None:
+            return False, None
+        if self.position >= len(self.index):
+            if not self.loop:
+                return False, None
+            self.set(cv.CAP_PROP_POS_FRAMES, 0)
+
+        if self.realtime:
+            # wait for the frame's recorded time (relative to when the replay started)
+            if self._startTime is None:
+                self._startTime = time.perf_counter() - self.index["timestamp"][self.position]
+            delay = self._startTime + self.index["timestamp"][self.position] - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        if self.codec == "raw":
+            frame = self._data[self.position]
+        else:
+            _timestamp, offset, size = self.index[self.position]
+            frame = cv.imdecode(self._data[offset:offset + size], cv.IMREAD_UNCHANGED)
+        self.position += 1
+
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return True, image
+        # a private copy: loops draw on their frames, and the recording must stay unchanged
+        return True, frame.copy() if self.codec == "raw" else frame
+
+    # recorded timestamp (seconds since the first frame) of the frame read last
+    def lastTimestamp(self):
+        return float(self.index["timestamp"][self.position - 1]) if self.position else None
+
+    def get(self, prop):
+        if prop == cv.CAP_PROP_POS_FRAMES:
+            return self.position
+        if prop == cv.CAP_PROP_FRAME_COUNT:
+            return len(self.index)
+        if prop == cv.CAP_PROP_FPS:
+            return self.meta["fps"] or 0
+        if prop == cv.CAP_PROP_FRAME_WIDTH:
+            return self.shape[1] if len(self.shape) > 1 else 0
+        if prop == cv.CAP_PROP_FRAME_HEIGHT:
+            return self.shape[0] if self.shape else 0
+        return 0
+
+    def set(self, prop, value):
+        if prop != cv.CAP_PROP_POS_FRAMES:
+            return False
+        self.position = int(min(max(value, 0), len(self.index)))
+        self._startTime = None
+        return True
+
+    def release(self):
+        self._opened = False
+        self._data = None
+
+
+# Source for a script from its command line: a webcam index, a video file or a recording directory,
+# plus the FrameGrabber mode to use. "--fast" replays every frame as fast as possible.
+def source_from_argv(argv=None, default=0):
+    argv = sys.argv[1:] if argv is None else argv
+    fast = "--fast" in argv
+    args = [arg for arg in argv if arg != "--fast"]
+    if not args:
+        return default, "latest"
+
+    source = args[0]
+    if source.isdigit():
+        return int(source), "latest"
+    if is_recording(source):
+        return ReplaySource(source, realtime=not fast), "all" if fast else "latest"
+    return source, "all" if fast else "latest"
+
+
+# Headless check: record synthetic frames with both codecs, then replay them as fast as possible
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    from _frameGrabber_module import synthetic_source
+
+    directory = tempfile.mkdtemp()
+    frames = list(synthetic_source(640, 480, 300))
+    try:
+        for codec in ("raw", "png"):
+            path = os.path.join(directory, codec)
+            start = time.perf_counter()
+            with Recorder(path, codec=codec) as recorder:
+                for i, frame in enumerate(frames):
+                    recorder.write(frame, timestamp=i / 30)
+            write_time = time.perf_counter() - start
+
+            replay = ReplaySource(path, realtime=False)
+            buffer = np.empty_like(frames[0])
+            start = time.perf_counter()
+            identical = True
+            for frame in frames:
+                ret, replayed = replay.read(buffer)
+                identical &= ret and np.array_equal(replayed, frame)
+            read_time = time.perf_counter() - start
+
+            size = os.path.getsize(os.path.join(path, "frames.bin"))
+            print(f"{codec}: {size / 1e6:6.1f} MB, write {len(frames) / write_time:6.0f} FPS, "
+                  f"replay {len(frames) / read_time:6.0f} FPS, identical: {identical}")
+    finally:
+        shutil.rmtree(directory)
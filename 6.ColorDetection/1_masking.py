@@ -1,22 +1,36 @@
 """
 This script captures video from a webcam, applies a color mask to isolate specific colors, and displays the masked output in real-time.
-Using OpenCV, it converts the video frames to HSV color space, applies a mask to isolate colors within specified HSV ranges (e.g., green or orange),
-and displays the masked result.
+The HSV ranges (e.g., green or orange) are turned into a BGR lookup table once, so every frame is labelled with one table lookup per
+pixel instead of being converted to HSV and filtered with cv.inRange (same masks, no HSV image).
 
 The process includes:
-1. Capturing frames from the webcam.
-2. Converting frames from BGR to HSV.
-3. Masking specific color ranges.
-4. Displaying the masked video feed with the ability to quit by pressing "q".
+1. Building the BGR -> colour lookup table from the HSV ranges (once, before the loop).
+2. Capturing frames from the webcam.
+3. Labelling every pixel of the frame with its colour through the lookup table.
+4. Taking the mask of one colour (green) from the labels.
+5. Displaying the masked video feed with the ability to quit by pressing "q".
+
+With a fixed camera, press "i" to switch to incremental masking: only the blocks of the frame that changed
+are masked again (see _incrementalLabeler_module.py), with a full pass every 30 frames.
 """
 
 import cv2 as cv
 import numpy as np
 from _util import get_limits  # Function to obtain color limits in HSV
 import _colors_module as c  # Custom module for color definitions
+from _frameGrabber_module import FrameGrabber  # Reads webcam frames on a background thread
+from _framePool_module import FramePool  # Reused output buffers (no new arrays per frame)
+from _stageTimer_module import StageTimer  # Per-stage latency (p50 / p95 / p99) and FPS
+from _colorLabeler_module import ColorLabeler  # Masks every palette colour in one pass
+from _incrementalLabeler_module import IncrementalLabeler  # Re-masks only the parts of the frame that changed
+from _recording_module import source_from_argv  # Webcam, video file or recorded session from the command line
 
-# Initialize webcam
-webcam = cv.VideoCapture(index=0)
+# Initialize webcam (newest frame only, stale frames are dropped, frame arrays are recycled)
+# `python 1_masking.py session/ --fast` replays a recorded session instead, every frame as fast as possible
+source, mode = source_from_argv(default=0)
+webcam = FrameGrabber(source, mode=mode, reuse_frames=True)
+pool = FramePool()
+timer = StageTimer()     # StageTimer(dump_path="timings.csv") also saves the timings every 5 seconds
 
 # Define HSV color ranges for masking specific colors
 low_green = np.array([52, 52, 72])     # Lower HSV bound for green
@@ -24,17 +38,29 @@ high_green = np.array([102, 255, 255])  # Upper HSV bound for green
 low_org = np.array([5, 50, 50])        # Lower HSV bound for orange
 high_org = np.array([15, 255, 255])    # Upper HSV bound for orange
 
+# Precompute a BGR -> colour lookup table for all the ranges (done once, before the loop)
+labeler = ColorLabeler(palette={"green": (low_green, high_green), "orange": (low_org, high_org)})
+
+# Motion-gated masking for static cameras: changed 32x32 blocks only, full refresh every 30 frames ('i' toggles)
+incremental = IncrementalLabeler(labeler, block=32, refresh_every=30)
+use_incremental = False
+
 while True:
     # Capture a frame from the webcam
-    ret, frame = webcam.read()
+    with timer.stage("capture"):
+        ret, frame = webcam.read()
     if not ret:
         break
 
-    # Convert the frame from BGR to HSV color space for easier color masking
-    hsv_img = cv.cvtColor(src=frame, code=cv.COLOR_BGR2HSV)
+    with timer.stage("masking"):
+        # Label every pixel with its colour (same result as converting to HSV and calling cv.inRange per colour)
+        if use_incremental:
+            incremental.label(frame)     # only the blocks that changed since they were last labelled
+        else:
+            labeler.label(frame)
 
-    # Create a binary mask to isolate the specified color range in the frame (green here)
-    mask = cv.inRange(src=hsv_img, lowerb=low_green, upperb=high_green) # works with hsv color
+        # Create a binary mask to isolate the specified color range in the frame (green here)
+        mask = labeler.mask("green", dst=pool.get("mask", frame.shape[:2]))
 
     # Steps to draw bounding boxes:
     # 1. opt: Convert the image to grayscale (if needed).
@@ -44,9 +70,21 @@ while True:
     # 5. Draw the bounding box around each detected object on the original image.
 
     # Display the masked frame (showing only areas in the green color range)
-    cv.imshow(winname="webcam", mat=mask)
-    if cv.waitKey(delay=1) & 0xFF == ord("q"):
+    with timer.stage("display"):
+        cv.imshow(winname="webcam", mat=mask)
+        key = cv.waitKey(delay=1) & 0xFF
+    timer.frame()
+    if key == ord("q"):
         break
+    if key == ord("i"):
+        use_incremental = not use_incremental
+        incremental.reset()      # start from a full pass (its reference frame is stale)
+        print(f"incremental masking: {use_incremental}")
+
+# Where the frame time went (rolling p50 / p95 / p99 per stage)
+print(timer.summary())
+if incremental.pathCounts["incremental"]:
+    print(f"incremental masking: {incremental.pathCounts}, last frame re-masked {incremental.lastFraction:.1%} of the pixels")
 
 # Release webcam and close OpenCV windows
 webcam.release()
@@ -1,48 +1,106 @@
 import cv2 as cv
-from _util import get_limits  # Function to obtain color limits in HSV
-from PIL import Image 
+from _util import get_limits, get_bboxes  # HSV color limits, bounding boxes of mask blobs
 import _colors_module as c
+from _frameGrabber_module import FrameGrabber
+from _colorLabeler_module import ColorLabeler  # BGR -> colour label lookup table
+from _framePool_module import FramePool  # Reused output buffers (no new arrays per frame)
+from _stageTimer_module import StageTimer  # Per-stage latency (p50 / p95 / p99) and FPS
+from _recording_module import source_from_argv  # Webcam, video file or recorded session from the command line
+from _coarseToFine_module import CoarseToFineDetector  # Boxes from a 1/4 frame, refined at full resolution
+from _colorTracker_module import ColorTracker  # Follows found objects with hue back-projection + CamShift
+import numpy as np
 
 # ================================
 # Webcam Color Detection with Bounding Box
 # ================================
 
-# Open the webcam
-webcam = cv.VideoCapture(index=0)
+# Open the webcam (or a video file / recorded session given on the command line, see the notes below)
+source, mode = source_from_argv(default=0)
+webcam = FrameGrabber(source, mode=mode, reuse_frames=True)
 
+# Output buffers for flip, the mask and the blob labels, allocated on the first frame only
+pool = FramePool()
+
+# Time every stage of the loop; the FPS and per-stage percentiles are drawn on the frame ('t' toggles them)
+timer = StageTimer()
+show_timings = True
+
+# Get the HSV color range for the target color (e.g., yellow) once, and turn it into a BGR lookup table
+# (add more colours to the palette at no extra cost per frame)
+labeler = ColorLabeler(palette={"yellow": get_limits(color=c.YELLOW)})
+
+# Coarse-to-fine mode ('c' toggles): find the boxes on a 1/4 frame, then measure them exactly at full
+# resolution only around each candidate (for large frames, e.g. 4K, where masking every pixel is expensive)
+coarse = CoarseToFineDetector(labeler, factor=4, min_area=500)
+use_coarse = False
+
+
+# Steps 1-7: boxes, areas and centroids of the yellow objects in the frame (full resolution or coarse-to-fine)
+def detect_boxes(frame):
+    if use_coarse:
+        # Steps 1-7 on a downscaled frame, refined at full resolution around the candidates
+        with timer.stage("coarse"):
+            bboxes, areas, centroids = coarse.detect(frame, "yellow")
+    else:
+        ###### masking #######
+        with timer.stage("masking"):
+            # Step 1-2: Label every pixel with its palette colour (one table lookup per pixel, no HSV image)
+            labeler.label(frame)
+
+            # Step 3: Create a mask to isolate the specified color range in the frame
+            mask = labeler.mask("yellow", dst=pool.get("mask", frame.shape[:2]))
+
+        ###### bounding box #######
+        with timer.stage("boxes"):
+            # Step 6-7: Get one bounding box per separate color blob, ignoring blobs smaller than 500 pixels
+            bboxes, areas, centroids = get_bboxes(mask, min_area=500, labels=pool.get("labels", mask.shape, np.int32))
+    return bboxes, areas, centroids
+
+
+# Tracking mode ('k' toggles): once an object is found, build its hue histogram and follow it with
+# back-projection + CamShift inside a window around its last position, so the cost scales with the object size
+tracker = ColorTracker(lambda frame: detect_boxes(frame)[0])
+use_tracking = False
 
 while True:
     # Capture a frame from the webcam
-    ret, frame = webcam.read()
-
-    frame = cv.flip(frame, 1)
-    ###### masking #######
-
-    # Step 1: Convert the frame from BGR to HSV color space
-    hsv_img = cv.cvtColor(src=frame, code=cv.COLOR_BGR2HSV)
-    
-    # Step 2: Get the HSV color range for the target color (e.g., yellow)
-    lowerLimit, upperLimit = get_limits(color=c.YELLOW)
-
-    # Step 3: Create a mask to isolate the specified color range in the frame
-    mask = cv.inRange(src=hsv_img, lowerb=lowerLimit, upperb=upperLimit)
-    
-    ###### bounding box #######
-    
-    # Step 6: Convert the mask (numpy array) to a PIL image for easy bounding box extraction
-    mask_ = Image.fromarray(mask)
-    # Step 7: Get the bounding box for the detected color area
-    bbox = mask_.getbbox()
-
-    # Step 8: Draw a bounding box if the color is detected in the frame
-    if bbox:
-        x1, y1, x2, y2 = bbox
-        cv.rectangle(img=frame, pt1=(x1, y1), pt2=(x2, y2), color=c.GREEN, thickness=4)
+    with timer.stage("capture"):
+        ret, frame = webcam.read()
+    if not ret:
+        break
+
+    with timer.stage("flip"):
+        frame = cv.flip(frame, 1, dst=pool.like("flip", frame))
+
+    if use_tracking:
+        # Follow the objects found earlier inside small search windows; detect_boxes runs again (full frame)
+        # when one is lost, its confidence drops, or every 60 frames to pick up new objects
+        with timer.stage("tracking"):
+            bboxes, confidences = tracker.update(frame)
+    else:
+        bboxes, areas, centroids = detect_boxes(frame)
+
+    # Step 8: Draw a bounding box around every detected object
+    with timer.stage("drawing"):
+        for x1, y1, x2, y2 in bboxes.tolist():
+            cv.rectangle(img=frame, pt1=(x1, y1), pt2=(x2, y2), color=c.GREEN, thickness=4)
+        if show_timings:
+            timer.draw(frame)
 
     # Display the frame with the bounding box
-    cv.imshow(winname="webcam", mat=frame)
-    if cv.waitKey(delay=1) & 0xFF == ord("q"):
+    with timer.stage("display"):
+        cv.imshow(winname="webcam", mat=frame)
+        key = cv.waitKey(delay=1) & 0xFF
+    timer.frame()
+    if key == ord("q"):
         break
+    if key == ord("t"):
+        show_timings = not show_timings
+    if key == ord("c"):
+        use_coarse = not use_coarse
+    if key == ord("k"):
+        use_tracking = not use_tracking
+        tracker.reset()
 
 # Release resources
 webcam.release()
@@ -53,12 +111,23 @@ cv.destroyAllWindows()
 # ================================
 # - **Step 1**: Initializes the webcam for capturing frames.
 # - **Step 2**: Reads each frame in the loop for processing.
-# - **Step 3**: Converts the frame to HSV, making it easier to filter by color.
-# - **Step 4**: Uses `get_limits` to obtain the HSV color range for yellow.
+# - **Step 3**: Labels the frame's pixels with the lookup table (same result as converting to HSV and filtering by color).
+# - **Step 4**: Uses `get_limits` to obtain the HSV color range for yellow (once, before the loop).
 # - **Step 5**: Creates a mask to identify areas in the image that match the color range.
-# - **Step 6**: Converts the mask to a PIL Image to extract the bounding box.
-# - **Step 7**: Extracts the bounding box around detected color areas in the mask.
-# - **Step 8**: Draws the bounding box on the frame to indicate detected color areas.
+# - **Step 6**: Finds the separate blobs in the mask with connected components (no PIL conversion).
+# - **Step 7**: Extracts a bounding box, area and centroid per blob, dropping blobs below `min_area`.
+# - **Step 8**: Draws a bounding box around each detected object (two yellow objects give two boxes).
 # - **Step 9**: Displays the processed frame with bounding boxes in a window.
 # - **Step 10**: Allows the user to press 'q' to stop the loop and close the display.
 # - **Step 11**: Releases the webcam and closes all OpenCV windows.
+# - **Buffers**: flip, the mask and the blob labels are written into `pool` buffers (`dst=`), so after the
+#   first frame the loop allocates no new frame-sized arrays (`pool.allocations` stays at 3).
+# - **Timings**: `timer.stage(...)` measures capture, flip, masking, boxes, drawing and display; the overlay shows
+#   the FPS and the rolling p50 / p95 / p99 of each stage, so you can see which one eats the frame budget.
+# - **Replays**: `python 2_color_detection.py session/` replays a session recorded with 5.Video/3_record.py at its
+#   recorded speed, `--fast` processes every frame as fast as possible (same input for before / after timings).
+# - **Coarse-to-fine** ('c'): the boxes are identical to the full-resolution path except for objects thinner than
+#   about 4 pixels, which can fall between the samples; `python _coarseToFine_module.py` measures both on 4K frames.
+# - **Tracking** ('k'): the boxes come from CamShift on the object's hue histogram instead of the fixed HSV range,
+#   so they can be a little larger or smaller than the masked blob; `python _colorTracker_module.py` compares
+#   both (time and box overlap) on a moving ball in 1080p frames.
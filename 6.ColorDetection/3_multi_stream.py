@@ -0,0 +1,86 @@
+"""
+This script runs the colour detection of 2_color_detection.py on several video sources at once (webcams
+and/or video files), one detector per stream, spread over a few worker processes pinned to separate CPU
+cores. Per-stream FPS, processing time and number of detected objects are merged into one table (printed
+every few seconds) and, with --show, one window with a thumbnail of every stream.
+
+Run (from the "6.ColorDetection" folder):
+    python 3_multi_stream.py 0 1                      # two webcams
+    python 3_multi_stream.py cam1.mp4 cam2.mp4 0 --workers 2 --show
+    python 3_multi_stream.py --test 8 --duration 20   # headless: 8 looping synthetic video files
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from functools import partial
+
+import _colors_module as c
+import cv2 as cv
+import numpy as np
+from _colorLabeler_module import ColorLabeler  # BGR -> colour label lookup table
+from _framePool_module import FramePool
+from _multiStream_module import MultiStreamRunner, make_test_videos
+from _util import get_bboxes, get_limits
+
+
+# ================================
+# One colour detector per stream (created inside the worker process)
+# ================================
+class ColorProcessor:
+    def __init__(self, palette, min_area=500):
+        self.labeler = ColorLabeler(palette=palette)
+        self.min_area = min_area
+        self.pool = FramePool()
+        self.boxes = {}
+
+    # bounding boxes of every palette colour in the frame; returns the number of objects per colour
+    def process(self, frame):
+        self.labeler.label(frame)
+        for name in self.labeler.names:
+            mask = self.labeler.mask(name, dst=self.pool.get("mask", frame.shape[:2]))
+            self.boxes[name], _areas, _centroids = get_bboxes(mask, min_area=self.min_area,
+                                                              labels=self.pool.get("labels", mask.shape, np.int32))
+        return {name: len(boxes) for name, boxes in self.boxes.items()}
+
+    # draw the last boxes on a resized copy of the frame
+    def draw(self, image, scale=1.0):
+        for boxes in self.boxes.values():
+            for x1, y1, x2, y2 in (boxes * scale).astype(int).tolist():
+                cv.rectangle(img=image, pt1=(x1, y1), pt2=(x2, y2), color=c.GREEN, thickness=2)
+
+
+def color_processor(palette, min_area=500):
+    return ColorProcessor(palette, min_area)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Colour detection on several video sources at once.")
+    parser.add_argument("sources", nargs="*", help="webcam indexes and/or video files")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per stream, at most one per CPU)")
+    parser.add_argument("--no-pin", action="store_true", help="don't pin the workers to CPU cores")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    parser.add_argument("--show", action="store_true", help="show all streams in one window")
+    parser.add_argument("--test", type=int, default=0, help="add N looping synthetic test videos")
+    parser.add_argument("--report", default=None, help="write the final per-stream summary to this JSON file")
+    args = parser.parse_args()
+
+    sources = [int(source) if source.isdigit() else source for source in args.sources]
+    if args.test:
+        sources += make_test_videos(os.path.join(tempfile.gettempdir(), "multi_stream_test"), args.test)
+    if not sources:
+        sources = [0]
+
+    factory = partial(color_processor, palette={"yellow": get_limits(color=c.YELLOW)})
+    runner = MultiStreamRunner(sources, factory, workers=args.workers, pin=not args.no_pin)
+    summary = runner.run(duration=args.duration, show=args.show)
+
+    print(runner.format_table())
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(summary, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
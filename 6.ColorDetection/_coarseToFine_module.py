@@ -0,0 +1,171 @@
+"""
+This module defines `CoarseToFineDetector`, which finds the bounding boxes of a colour without labelling
+(masking) the whole full-resolution frame.
+
+Only the boxes are needed, so:
+1. Coarse: the frame is downscaled by `factor` (4 or 8) with INTER_NEAREST, i.e. every factor-th pixel is
+   sampled with its exact colour (averaging would invent colours along edges), and labelled with the same
+   ColorLabeler lookup table. Blobs of the mask give candidate boxes (a lower area limit than the final one,
+   so blobs near the limit aren't lost to sampling).
+2. Fine: each candidate box, scaled back and grown by `margin` pixels (overlapping ones merged), is labelled
+   at full resolution, and the blobs inside it give the final boxes, areas and centroids, in the same
+   format as `get_bboxes` on the full mask. A blob touching its region's edge grows the region and is
+   measured again, so thin parts that fell between the samples aren't cut off.
+
+At factor 4, the coarse pass labels 1/16 of the pixels and the fine pass only the regions around objects,
+so for a few objects in a 4K frame the masking work drops by about an order of magnitude.
+
+Accuracy: a blob is found when at least one of its sampled pixels falls inside it and the sampled blob is
+at least min_area / factor^2 / 2 samples, so objects smaller than about `factor` pixels across can be missed.
+Every box that is found is exact (measured at full resolution). Blobs that touch diagonally at full resolution
+but whose samples don't can't merge, so results match full-resolution `get_bboxes` except for such tiny or
+thin objects (run this module to measure it).
+"""
+
+import time
+
+import cv2 as cv
+import numpy as np
+from _util import get_bboxes
+
+
+# merge regions [x1, y1, x2, y2, grown] that overlap, until none do (grown: the larger count)
+def _mergeRegions(regions):
+    regions = [list(region) for region in regions]
+    i = 0
+    while i < len(regions):
+        for j in range(i + 1, len(regions)):
+            a, b = regions[i], regions[j]
+            if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                regions[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]), max(a[4], b[4])]
+                del regions[j]
+                i = -1      # the grown region may now overlap earlier ones
+                break
+        i += 1
+    return regions
+
+
+class CoarseToFineDetector:
+    # labeler: a ColorLabeler (its lookup table is shared, it keeps the full-resolution label buffers)
+    def __init__(self, labeler, factor=4, margin=None, min_area=500, connectivity=8, max_grow=3):
+        self.labeler = labeler
+        self.coarseLabeler = labeler.clone()
+        self.factor = factor
+        self.margin = 2 * factor if margin is None else margin
+        self.min_area = min_area
+        self.connectivity = connectivity
+        self.max_grow = max_grow            # times a region may grow for a blob touching its edge
+
+        self.regions = []                   # full-resolution regions labelled on the last call
+        self.lastFraction = 0.0             # labelled pixels (coarse + fine) / frame pixels on the last call
+
+    # (boxes, areas, centroids) of the blobs of colour `name`, like get_bboxes(mask, min_area)
+    def detect(self, frame, name):
+        height, width = frame.shape[:2]
+        label = self.labeler.names.index(name) + 1
+
+        # 1. coarse candidates on the sampled frame
+        small = cv.resize(frame, (width // self.factor, height // self.factor), interpolation=cv.INTER_NEAREST)
+        coarseMask = cv.compare(self.coarseLabeler.label(small), label, cv.CMP_EQ)
+        candidates, _areas, _centroids = get_bboxes(coarseMask, min_area=self.min_area / self.factor ** 2 / 2,
+                                                    connectivity=self.connectivity)
+        labelled = small.shape[0] * small.shape[1]
+
+        regions = _mergeRegions([(max(0, x1 * self.factor - self.margin), max(0, y1 * self.factor - self.margin),
+                                  min(width, x2 * self.factor + self.margin), min(height, y2 * self.factor + self.margin), 0)
+                                 for x1, y1, x2, y2 in candidates.tolist()])
+
+        # 2. exact boxes inside each region, at full resolution
+        done = []           # (region, boxes, areas, centroids)
+        while regions:
+            x1, y1, x2, y2, grown = regions.pop()
+            self.labeler.labelRegion(frame, x1, y1, x2, y2)
+            labelled += (x2 - x1) * (y2 - y1)
+            mask = cv.compare(self.labeler.labels[y1:y2, x1:x2], label, cv.CMP_EQ)
+            boxes, areas, centroids = get_bboxes(mask, min_area=self.min_area, connectivity=self.connectivity)
+
+            # a blob cut by the region's edge (not the frame's): grow the region (merging it with the regions it
+            # now overlaps, finished ones included) and measure it again
+            cut = ((boxes[:, 0] == 0) & (x1 > 0)) | ((boxes[:, 1] == 0) & (y1 > 0)) | \
+                  ((boxes[:, 2] == x2 - x1) & (x2 < width)) | ((boxes[:, 3] == y2 - y1) & (y2 < height))
+            if cut.any() and grown < self.max_grow:
+                grow = 2 * self.margin
+                bigger = [max(0, x1 - grow), max(0, y1 - grow), min(width, x2 + grow), min(height, y2 + grow), grown + 1]
+                overlapping = [item for item in done if item[0][0] < bigger[2] and bigger[0] < item[0][2]
+                               and item[0][1] < bigger[3] and bigger[1] < item[0][3]]
+                done = [item for item in done if item not in overlapping]
+                regions = _mergeRegions(regions + [bigger] + [list(item[0]) + [grown + 1] for item in overlapping])
+                continue
+
+            done.append(((x1, y1, x2, y2), boxes + (x1, y1, x1, y1), areas, centroids + (x1, y1)))
+
+        self.regions = [item[0] for item in done]
+        self.lastFraction = labelled / (width * height)
+        if not done:
+            return np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.int32), np.empty((0, 2))
+        return tuple(np.concatenate(parts) for parts in list(zip(*done))[1:])
+
+
+# Headless check on synthetic 4K frames: coloured blobs of random size and thin lines on a textured background.
+# Compares time, pixels labelled and the boxes with the full-resolution path (label + mask + get_bboxes).
+if __name__ == "__main__":
+    from _colorLabeler_module import ColorLabeler
+
+    rng = np.random.default_rng(1)
+    height, width = 2160, 3840
+    background = cv.GaussianBlur(rng.integers(0, 256, (height // 8, width // 8, 3), dtype=np.uint8), (0, 0), 2)
+    background = cv.resize(background, (width, height), interpolation=cv.INTER_LINEAR)
+    background = cv.cvtColor(cv.cvtColor(background, cv.COLOR_BGR2GRAY), cv.COLOR_GRAY2BGR)   # no colour of its own
+
+    def scene():
+        frame = background.copy()
+        for _ in range(8):
+            center = (int(rng.integers(100, width - 100)), int(rng.integers(100, height - 100)))
+            axes = (int(rng.integers(8, 150)), int(rng.integers(8, 150)))
+            cv.ellipse(frame, center, axes, float(rng.uniform(0, 180)), 0, 360, (0, 220, 255), cv.FILLED)
+        for _ in range(2):
+            # thin lines (3 px), the hard case for sampling
+            x, y = int(rng.integers(200, width - 200)), int(rng.integers(200, height - 200))
+            dx, dy = rng.integers(-200, 200, 2).tolist()
+            cv.line(frame, (x, y), (x + dx, y + dy), (0, 220, 255), 3)
+        return frame
+
+    frames = [scene() for _ in range(20)]
+    palette = {"yellow": (np.array([20, 100, 100]), np.array([40, 255, 255]))}
+    full = ColorLabeler(palette)
+
+    def full_path(frame):
+        full.label(frame)
+        return get_bboxes(full.mask("yellow"), min_area=500)
+
+    def iou(a, b):
+        w = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+        h = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+        union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - w * h
+        return w * h / union
+
+    for factor in (4, 8):
+        detector = CoarseToFineDetector(ColorLabeler(palette), factor=factor, min_area=500)
+        fullTimes, coarseTimes, fractions = [], [], []
+        expected = found = exact = 0
+        ious = []
+        for frame in frames:
+            start = time.perf_counter()
+            reference, _areas, _centroids = full_path(frame)
+            fullTimes.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            boxes, _areas, _centroids = detector.detect(frame, "yellow")
+            coarseTimes.append(time.perf_counter() - start)
+            fractions.append(detector.lastFraction)
+
+            expected += len(reference)
+            for box in reference.tolist():
+                best = max((iou(box, other) for other in boxes.tolist()), default=0.0)
+                found += best > 0.5
+                exact += best == 1.0
+                ious.append(best)
+
+        print(f"factor {factor}: full {np.median(fullTimes) * 1000:.1f} ms, coarse-to-fine {np.median(coarseTimes) * 1000:.1f} ms "
+              f"per 4K frame (p50); labelled {np.mean(fractions) * 100:.1f}% of the pixels; "
+              f"boxes found {found}/{expected}, identical {exact}/{expected}, mean IoU {np.mean(ious):.4f}")
@@ -0,0 +1,103 @@
+"""
+This module defines `ColorLabeler`, which labels every pixel of a BGR frame with the palette colour it
+belongs to, for all colours at once.
+
+Instead of converting every frame to HSV and calling `cv.inRange` once per colour, the HSV ranges are
+evaluated once, up front, for every (quantized) BGR value. The result is a lookup table BGR -> label
+with one entry per 24-bit colour (16 MB), so labelling a frame is a single table lookup per pixel no
+matter how many colours the palette has, and no HSV image is ever allocated.
+
+Palette:
+- A dict {name: colour}, where colour is either a BGR tuple (e.g. `_colors_module.YELLOW`, its range
+  comes from `get_limits`) or a (lowerLimit, upperLimit) pair of HSV bounds like the ones used with `cv.inRange`.
+- Label 0 is "no colour", labels 1..N follow the palette order. If ranges overlap, the first colour wins.
+
+Quantization:
+- `bits` is the number of bits per BGR channel the ranges are evaluated at when building the table.
+  bits=8 is exact (same result as cvtColor + inRange) but takes close to a second to build; the default
+  bits=6 builds several times faster and only differs for colours within a few BGR steps of a range boundary.
+"""
+
+import copy
+
+import cv2 as cv
+import numpy as np
+from _util import get_limits
+
+
+class ColorLabeler:
+    def __init__(self, palette, bits=6):
+        if not 1 <= bits <= 8:
+            raise ValueError(f"bits must be between 1 and 8, got {bits}")
+        if len(palette) > 255:
+            raise ValueError("a palette can have at most 255 colours")
+
+        self.bits = bits
+        self.names = list(palette)
+        self.ranges = {}
+        for name, colour in palette.items():
+            if len(colour) == 2:
+                lowerLimit, upperLimit = colour
+            else:
+                lowerLimit, upperLimit = get_limits(color=colour)
+            self.ranges[name] = (np.asarray(lowerLimit, dtype=np.uint8), np.asarray(upperLimit, dtype=np.uint8))
+
+        self.lut = self._buildLut()
+        self.labels = None
+
+    # label of every BGR value, evaluated with the same cvtColor + inRange the scripts use
+    def _buildLut(self):
+        levels = 1 << self.bits
+        shift = 8 - self.bits
+
+        # BGR value in the middle of each quantization cell, laid out as an (levels**3, 1) image in [r, g, b] order
+        values = (np.arange(levels, dtype=np.uint16) << shift) + ((1 << shift) >> 1)
+        r, g, b = np.meshgrid(values, values, values, indexing="ij")
+        bgr = np.stack([b, g, r], axis=-1).reshape(-1, 1, 3).astype(np.uint8)
+        hsv = cv.cvtColor(src=bgr, code=cv.COLOR_BGR2HSV)
+
+        cells = np.zeros(len(bgr), dtype=np.uint8)
+        for label, name in enumerate(self.names, start=1):
+            lowerLimit, upperLimit = self.ranges[name]
+            mask = cv.inRange(src=hsv, lowerb=lowerLimit, upperb=upperLimit).ravel()
+            cells[(mask > 0) & (cells == 0)] = label
+
+        # expand to one entry per 24-bit colour, indexed by b | g << 8 | r << 16
+        cell = np.arange(256) >> shift
+        return cells.reshape(levels, levels, levels)[np.ix_(cell, cell, cell)].ravel()
+
+    def _allocate(self, height, width):
+        if self.labels is None or self.labels.shape != (height, width):
+            self.labels = np.zeros((height, width), dtype=np.uint8)
+            # BGR + zero bytes, so each pixel read as a little-endian int64 is b | g << 8 | r << 16.
+            # (int64 is NumPy's index type, so np.take doesn't make a converted copy of the indices every frame)
+            self._bgr0 = np.zeros((height, width, 8), dtype=np.uint8)
+            self._index = self._bgr0.view(np.int64)[:, :, 0]
+
+    # label image (uint8, same height/width as frame) for a BGR frame
+    def label(self, frame):
+        self._allocate(*frame.shape[:2])
+        cv.mixChannels([frame], [self._bgr0], [0, 0, 1, 1, 2, 2])
+        np.take(self.lut, self._index, out=self.labels, mode="clip")
+        return self.labels
+
+    # re-label only the pixels in [y1:y2, x1:x2] of the label image (the rest keeps its labels)
+    def labelRegion(self, frame, x1, y1, x2, y2):
+        self._allocate(*frame.shape[:2])
+        cv.mixChannels([frame[y1:y2, x1:x2]], [self._bgr0[y1:y2, x1:x2]], [0, 0, 1, 1, 2, 2])
+        np.take(self.lut, self._index[y1:y2, x1:x2], out=self.labels[y1:y2, x1:x2], mode="clip")
+        return self.labels
+
+    # a labeler sharing this one's lookup table but with its own label image (e.g. for frames of another size)
+    def clone(self):
+        other = copy.copy(self)
+        other.labels = None
+        return other
+
+    # 0/255 mask of one palette colour (like cv.inRange) from the last label image
+    def mask(self, name, dst=None):
+        return cv.compare(self.labels, self.names.index(name) + 1, cv.CMP_EQ, dst=dst)
+
+    # {name: mask} for every palette colour
+    def masks(self):
+        return {name: self.mask(name) for name in self.names}
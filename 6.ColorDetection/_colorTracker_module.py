@@ -0,0 +1,178 @@
+"""
+This module defines `ColorTracker`, which follows colour objects from frame to frame with hue-histogram
+back-projection and CamShift, and falls back to full-frame detection when it loses them.
+
+Detecting a colour object means masking every pixel of every frame. Once an object has been found, its
+colour and rough position are known, so:
+1. Detection (first frame, after a loss and every `redetect_every` frames, to pick up new objects): the
+   `detect(frame)` function you pass (e.g. ColorLabeler + get_bboxes) returns the boxes, and for each box a
+   hue histogram of its saturated pixels is built once.
+2. Tracking (all other frames): for each object only a search window around its last box (grown by
+   `search_margin` of its size) is converted to HSV and back-projected through the object's histogram,
+   giving a "how much does this pixel look like the object" image, and CamShift moves / resizes the box to
+   the densest part of it. Cost scales with the object size, not the frame size.
+3. Confidence: the mean back-projection inside the new box (0-1). When it drops below `min_confidence` or
+   the box collapses, the objects are detected again on the full frame.
+
+    def detect(frame):
+        labeler.label(frame)
+        return get_bboxes(labeler.mask("yellow"), min_area=500)[0]
+
+    tracker = ColorTracker(detect)
+    boxes, confidences = tracker.update(frame)
+"""
+
+import time
+
+import cv2 as cv
+import numpy as np
+
+
+class _Track:
+    def __init__(self, box, hist):
+        self.box = box              # (x1, y1, x2, y2)
+        self.hist = hist            # normalized hue histogram (0-255)
+        self.confidence = 1.0
+        self.rotatedBox = None      # last CamShift result ((cx, cy), (w, h), angle)
+
+
+class ColorTracker:
+    # detect: function frame -> (n, 4) array of (x1, y1, x2, y2) boxes
+    # min_saturation / min_value: pixels darker or greyer than this have no reliable hue and are ignored
+    def __init__(self, detect, bins=32, search_margin=0.5, min_confidence=0.25, redetect_every=60,
+                 min_saturation=60, min_value=40, max_objects=8):
+        self.detect = detect
+        self.bins = bins
+        self.search_margin = search_margin
+        self.min_confidence = min_confidence
+        self.redetect_every = redetect_every
+        self.min_saturation = min_saturation
+        self.min_value = min_value
+        self.max_objects = max_objects
+        self.criteria = (cv.TERM_CRITERIA_EPS | cv.TERM_CRITERIA_COUNT, 10, 1)
+
+        self.tracks = []
+        self.lastPath = None            # "detect" or "track"
+        self.pathCounts = {"detect": 0, "track": 0}
+        self.lastFraction = 0.0         # fraction of the frame's pixels converted to HSV on the last frame
+        self._sinceDetect = 0
+        self._searched = 0              # pixels converted while tracking the current frame
+
+    # hue image and "has a reliable hue" mask of a region
+    def _hue(self, frame, x1, y1, x2, y2):
+        hsv = cv.cvtColor(frame[y1:y2, x1:x2], cv.COLOR_BGR2HSV)
+        valid = cv.inRange(hsv, (0, self.min_saturation, self.min_value), (180, 255, 255))
+        return hsv, valid
+
+    def _redetect(self, frame):
+        boxes = np.asarray(self.detect(frame)).reshape(-1, 4)[:self.max_objects]
+        self.tracks = []
+        for x1, y1, x2, y2 in boxes.tolist():
+            hsv, valid = self._hue(frame, x1, y1, x2, y2)
+            hist = cv.calcHist([hsv], [0], valid, [self.bins], [0, 180])
+            cv.normalize(hist, hist, 0, 255, cv.NORM_MINMAX)
+            self.tracks.append(_Track((x1, y1, x2, y2), hist))
+        self._sinceDetect = 1
+        self.lastPath = "detect"
+        self.lastFraction = 1.0
+
+    # follow one object inside its search window; False when it was lost
+    def _follow(self, frame, track):
+        height, width = frame.shape[:2]
+        x1, y1, x2, y2 = track.box
+        marginX = int((x2 - x1) * self.search_margin) + 8
+        marginY = int((y2 - y1) * self.search_margin) + 8
+        sx1, sy1 = max(0, x1 - marginX), max(0, y1 - marginY)
+        sx2, sy2 = min(width, x2 + marginX), min(height, y2 + marginY)
+
+        hsv, valid = self._hue(frame, sx1, sy1, sx2, sy2)
+        probability = cv.calcBackProject([hsv], [0], track.hist, [0, 180], 1)
+        cv.bitwise_and(probability, valid, dst=probability)
+
+        window = (x1 - sx1, y1 - sy1, max(1, x2 - x1), max(1, y2 - y1))
+        rotated, (wx, wy, ww, wh) = cv.CamShift(probability, window, self.criteria)
+        self._searched += (sx2 - sx1) * (sy2 - sy1)
+        if ww < 2 or wh < 2:
+            return False
+
+        track.confidence = float(cv.mean(probability[wy:wy + wh, wx:wx + ww])[0]) / 255
+        track.box = (sx1 + wx, sy1 + wy, sx1 + wx + ww, sy1 + wy + wh)
+        (cx, cy), size, angle = rotated
+        track.rotatedBox = ((cx + sx1, cy + sy1), size, angle)
+        return track.confidence >= self.min_confidence
+
+    # boxes (n, 4) as (x1, y1, x2, y2) and confidences (n,) of the objects in this frame
+    def update(self, frame):
+        due = self.redetect_every and self._sinceDetect >= self.redetect_every
+        if not self.tracks or due:
+            self._redetect(frame)
+        else:
+            self._searched = 0
+            if all(self._follow(frame, track) for track in self.tracks):
+                self._sinceDetect += 1
+                self.lastPath = "track"
+                self.lastFraction = self._searched / (frame.shape[0] * frame.shape[1])
+            else:
+                self._redetect(frame)       # lost (or unsure about) an object: look at the whole frame again
+        self.pathCounts[self.lastPath] += 1
+        return self.boxes(), np.array([track.confidence for track in self.tracks])
+
+    def boxes(self):
+        return np.array([track.box for track in self.tracks], dtype=np.int32).reshape(-1, 4)
+
+    # forget the objects: the next frame is detected on the full frame
+    def reset(self):
+        self.tracks = []
+
+
+# Headless check on synthetic 1080p frames: a yellow ball moving over a textured background.
+# Compares full detection on every frame with tracking (time, IoU with the full-detection box).
+if __name__ == "__main__":
+    from _colorLabeler_module import ColorLabeler
+    from _util import get_bboxes
+
+    rng = np.random.default_rng(0)
+    height, width, num_frames = 1080, 1920, 300
+    background = cv.GaussianBlur(rng.integers(0, 256, (height // 8, width // 8, 3), dtype=np.uint8), (0, 0), 2)
+    background = cv.resize(background, (width, height))
+    background = cv.cvtColor(cv.cvtColor(background, cv.COLOR_BGR2GRAY), cv.COLOR_GRAY2BGR)
+
+    def scene(i):
+        frame = background.copy()
+        x = int(width / 2 + 700 * np.sin(i / 40))
+        y = int(height / 2 + 300 * np.cos(i / 25))
+        cv.circle(frame, (x, y), 60, (0, 220, 255), cv.FILLED)
+        noise = rng.integers(-4, 5, frame.shape, dtype=np.int16)
+        return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+    frames = [scene(i) for i in range(num_frames)]
+    labeler = ColorLabeler({"yellow": (np.array([20, 100, 100]), np.array([40, 255, 255]))})
+
+    def detect(frame):
+        labeler.label(frame)
+        return get_bboxes(labeler.mask("yellow"), min_area=500)[0]
+
+    def iou(a, b):
+        w = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+        h = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+        return w * h / ((a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - w * h)
+
+    detectTimes, expected = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        expected.append(detect(frame))
+        detectTimes.append(time.perf_counter() - start)
+
+    tracker = ColorTracker(detect)
+    trackTimes, ious, fractions = [], [], []
+    for frame, reference in zip(frames, expected):
+        start = time.perf_counter()
+        boxes, _confidences = tracker.update(frame)
+        trackTimes.append(time.perf_counter() - start)
+        fractions.append(tracker.lastFraction)
+        ious.append(iou(boxes[0].tolist(), reference[0].tolist()) if len(boxes) else 0.0)
+
+    print(f"full detection every frame: {np.median(detectTimes) * 1000:.2f} ms (p50)")
+    print(f"tracking:                   {np.median(trackTimes) * 1000:.2f} ms (p50), {np.mean(trackTimes) * 1000:.2f} ms mean, "
+          f"{np.mean(fractions) * 100:.1f}% of the pixels converted on average, {tracker.pathCounts}")
+    print(f"box IoU vs. full detection: mean {np.mean(ious):.3f}, min {np.min(ious):.3f}")
@@ -0,0 +1,200 @@
+"""
+This module defines `StageTimer`, a lightweight per-stage latency recorder for live frame loops.
+
+Wrap each stage of the loop (capture, colour conversion, inference / masking, drawing, display) in
+`with timer.stage(name):` and call `timer.frame()` once per iteration:
+
+    timer = StageTimer(dump_path="timings.csv")
+    while True:
+        with timer.stage("capture"):
+            ret, frame = webcam.read()
+        with timer.stage("flip"):
+            frame = cv.flip(frame, 1)
+        timer.draw(frame)                 # optional on-frame overlay: FPS and p50 / p95 / p99 per stage
+        with timer.stage("display"):
+            cv.imshow("webcam", frame)
+        timer.frame()
+
+- Every stage keeps its last `window` durations in a ring buffer (a preallocated NumPy array), so the
+  percentiles are rolling: they describe the last few seconds, not the whole run. Recording a duration is
+  two perf_counter() calls and one array store (each `with` gets its own small timing object, so a
+  stage can be nested or used from several threads); percentiles are only computed when asked for
+  (`summary()`, `draw()`, dumps), and the overlay text is refreshed at most every `refresh` seconds.
+- `timer.frame()` also records the whole frame time, which gives the FPS.
+- With `dump_path`, a summary is written every `dump_every` seconds: `.csv` and `.jsonl` files get one row /
+  line per dump appended, a `.json` file is replaced with the latest summary.
+- `StageTimer(enabled=False)` turns every call into a no-op, so instrumented code can stay in place.
+"""
+
+import csv
+import json
+import os
+import time
+
+import cv2 as cv
+import numpy as np
+
+
+class _Stage:
+    def __init__(self, window):
+        self.samples = np.zeros(window, dtype=np.float64)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+
+    # durations currently in the window
+    def recent(self):
+        return self.samples[:min(self.count, len(self.samples))]
+
+
+# one use of a stage (`with timer.stage(name):`): holds its own start time, so the same stage can be nested
+# or timed from several threads at once without the uses overwriting each other's start
+class _Timing:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stage.add(time.perf_counter() - self.start)
+
+
+class _NoStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+class StageTimer:
+    def __init__(self, window=300, enabled=True, dump_path=None, dump_every=5.0, refresh=0.5):
+        self.window = window                # samples kept per stage
+        self.enabled = enabled
+        self.dump_path = dump_path
+        self.dump_every = dump_every        # seconds between dumps
+        self.refresh = refresh              # seconds between overlay text updates
+
+        self.stages = {}                    # name -> _Stage, in first-use order
+        self._frame = _Stage(window)        # whole-iteration time
+        self._lastFrame = None
+        self._lastDump = time.perf_counter()
+        self._lastRefresh = None
+        self._lines = []
+
+    # context manager timing one stage of the current frame
+    def stage(self, name):
+        if not self.enabled:
+            return _NO_STAGE
+        return _Timing(self._stage(name))
+
+    def _stage(self, name):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages.setdefault(name, _Stage(self.window))
+        return stage
+
+    # record a duration measured elsewhere (e.g. capture time reported by a grabber)
+    def add(self, name, seconds):
+        if self.enabled:
+            self._stage(name).add(seconds)
+
+    # mark the end of a loop iteration
+    def frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._lastFrame is not None:
+            self._frame.add(now - self._lastFrame)
+        self._lastFrame = now
+
+        if self.dump_path and now - self._lastDump >= self.dump_every:
+            self.dump(self.dump_path)
+            self._lastDump = now
+
+    def fps(self):
+        recent = self._frame.recent()
+        return len(recent) / recent.sum() if len(recent) and recent.sum() > 0 else 0.0
+
+    # {"fps": ..., "stages": {name: {"count", "mean_ms", "p50_ms", "p95_ms", "p99_ms"}}} over the window
+    def summary(self):
+        stages = {}
+        for name, stage in list(self.stages.items()) + [("frame", self._frame)]:
+            recent = stage.recent()
+            if not len(recent):
+                continue
+            p50, p95, p99 = np.percentile(recent, [50, 95, 99]) * 1000
+            stages[name] = {"count": stage.count, "mean_ms": float(recent.mean() * 1000),
+                            "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+        return {"time": time.time(), "fps": self.fps(), "stages": stages}
+
+    # write the current summary (format from the extension: .csv, .jsonl or .json)
+    def dump(self, path):
+        summary = self.summary()
+        extension = os.path.splitext(path)[1].lower()
+
+        if extension == ".csv":
+            fields = ["time", "stage", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "fps"]
+            new_file = not os.path.exists(path)
+            with open(path, "a", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                if new_file:
+                    writer.writeheader()
+                for name, row in summary["stages"].items():
+                    writer.writerow({"time": summary["time"], "stage": name, **row, "fps": summary["fps"]})
+        elif extension == ".jsonl":
+            with open(path, "a") as f:
+                f.write(json.dumps(summary) + "\n")
+        else:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(summary, f, indent=2)
+            os.replace(tmp_path, path)
+
+    # draw FPS and the per-stage percentiles in the top-left corner of the frame
+    def draw(self, img, org=(10, 20), color=(255, 255, 255), fontScale=0.5):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._lastRefresh is None or now - self._lastRefresh >= self.refresh:
+            summary = self.summary()
+            self._lines = [f"FPS {summary['fps']:5.1f}   (ms)   p50    p95    p99"]
+            for name, row in summary["stages"].items():
+                self._lines.append(f"{name:<10}{row['p50_ms']:14.1f}{row['p95_ms']:7.1f}{row['p99_ms']:7.1f}")
+            self._lastRefresh = now
+
+        x, y = org
+        step = int(22 * fontScale / 0.5)
+        cv.rectangle(img, (x - 5, y - step + 4), (x + int(300 * fontScale / 0.5), y + step * (len(self._lines) - 1) + 8),
+                     (0, 0, 0), cv.FILLED)
+        for i, line in enumerate(self._lines):
+            cv.putText(img, line, (x, y + i * step), cv.FONT_HERSHEY_SIMPLEX, fontScale, color, 1, cv.LINE_AA)
+
+
+# Overhead check: time an empty stage many times
+if __name__ == "__main__":
+    timer = StageTimer()
+    runs = 200_000
+    start = time.perf_counter()
+    for _ in range(runs):
+        with timer.stage("empty"):
+            pass
+    per_call = (time.perf_counter() - start) / runs
+    print(f"overhead per timed stage: {per_call * 1e6:.2f} us")
+
+    img = np.zeros((480, 640, 3), dtype=np.uint8)
+    start = time.perf_counter()
+    for _ in range(1000):
+        timer.frame()
+        timer.draw(img)
+    print(f"frame() + draw() per frame: {(time.perf_counter() - start) * 1000 / 1000:.3f} ms")
+    print(json.dumps(timer.summary()["stages"]["empty"], indent=2))
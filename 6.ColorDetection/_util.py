@@ -13,6 +13,11 @@ Parameters:
 Returns:
 - lowerLimit: The lower HSV limit for the given color.
 - upperLimit: The upper HSV limit for the given color.
+
+It also defines `get_bboxes(mask, min_area)`, which finds every separate blob in a binary mask
+(e.g. the output of `cv2.inRange`) and returns one bounding box, area and centroid per blob,
+using a single connected-components pass directly on the NumPy mask. In a frame loop, pass a reused
+int32 array as `labels` so the label image isn't allocated again every frame.
 """
 
 import numpy as np
@@ -37,3 +42,19 @@ def get_limits(color):
         upperLimit = np.array([hue + 10, 255, 255], dtype=np.uint8)  # Upper bound
 
     return lowerLimit, upperLimit
+
+
+def get_bboxes(mask, min_area=100, connectivity=8, labels=None):
+    # Label connected blobs of non-zero pixels; row 0 of stats/centroids is the background
+    _num, _labels, stats, centroids = cv2.connectedComponentsWithStats(mask, labels=labels, connectivity=connectivity)
+    stats, centroids = stats[1:], centroids[1:]
+
+    # Drop blobs smaller than min_area pixels (noise)
+    keep = stats[:, cv2.CC_STAT_AREA] >= min_area
+    stats, centroids = stats[keep], centroids[keep]
+
+    # Boxes as (x1, y1, x2, y2) with x2, y2 exclusive, the same convention as PIL's getbbox()
+    x, y = stats[:, cv2.CC_STAT_LEFT], stats[:, cv2.CC_STAT_TOP]
+    boxes = np.column_stack([x, y, x + stats[:, cv2.CC_STAT_WIDTH], y + stats[:, cv2.CC_STAT_HEIGHT]])
+
+    return boxes, stats[:, cv2.CC_STAT_AREA], centroids
@@ -1,13 +1,15 @@
 import cv2 as cv
 import mediapipe as mp
-import time
+from _stageTimer_module import StageTimer  # Per-stage latency (p50 / p95 / p99) and FPS
+from _recording_module import ReplaySource, source_from_argv  # Recorded sessions instead of the webcam
 
 # ================================
 # Hand Tracking with Mediapipe
 # ================================
 
-# Initialize the webcam
-wc = cv.VideoCapture(0)
+# Initialize the webcam (or a recorded session: `python 1_hand_det.py session/`, a drop-in for VideoCapture)
+source, _mode = source_from_argv(default=0)
+wc = source if isinstance(source, ReplaySource) else cv.VideoCapture(source)
 
 # Step 1: Set up Mediapipe hand-tracking module
 mpHand = mp.solutions.hands  # Initializes MediaPipe's hand-tracking module.
@@ -16,36 +18,50 @@ hands = mpHand.Hands()  # Creates an instance of the hand detection and tracking
 # Step 2: Set up Mediapipe drawing utility for landmarks
 mpDraw = mp.solutions.drawing_utils
 
+# Step 7: Time every stage of the loop (the FPS and per-stage p50 / p95 / p99 are drawn on the frame)
+timer = StageTimer()
+
 while True:
     # Read a frame from the webcam
-    isSuccess, frame = wc.read()
+    with timer.stage("capture"):
+        isSuccess, frame = wc.read()
+    if not isSuccess:
+        break
 
     # Step 3: Convert the frame to RGB (Mediapipe expects RGB format)
-    rgb_img = cv.cvtColor(src=frame, code=cv.COLOR_BGR2RGB)
+    with timer.stage("convert"):
+        rgb_img = cv.cvtColor(src=frame, code=cv.COLOR_BGR2RGB)
 
     # Step 4: Process the RGB image with the hand-tracking model
-    res = hands.process(rgb_img)
-    
-    # Step 5: Check if hands are detected
-    if res.multi_hand_landmarks:
-        # Loop over each detected hand
-        for handLms in res.multi_hand_landmarks:
-            # Loop over each landmark in the detected hand
-            for id, lm in enumerate(handLms.landmark):
-                height, width, chnls = frame.shape
-                cx, cy = int(lm.x * width), int(lm.y * height)
+    with timer.stage("inference"):
+        res = hands.process(rgb_img)
+
+    with timer.stage("drawing"):
+        # Step 5: Check if hands are detected
+        if res.multi_hand_landmarks:
+            # Loop over each detected hand
+            for handLms in res.multi_hand_landmarks:
+                # Loop over each landmark in the detected hand
+                for id, lm in enumerate(handLms.landmark):
+                    height, width, chnls = frame.shape
+                    cx, cy = int(lm.x * width), int(lm.y * height)
 
-                # Optional: Highlight specific landmarks (e.g., tips of index and middle fingers)
-                if id == 8 or id == 12:
-                    cv.circle(img=frame, center=(cx, cy), radius=40, color=(255, 255, 0), thickness=cv.FILLED)
+                    # Optional: Highlight specific landmarks (e.g., tips of index and middle fingers)
+                    if id == 8 or id == 12:
+                        cv.circle(img=frame, center=(cx, cy), radius=40, color=(255, 255, 0), thickness=cv.FILLED)
 
-            # Step 6: Draw landmarks and hand connections on the frame
-            mpDraw.draw_landmarks(frame, handLms, mpHand.HAND_CONNECTIONS)
+                # Step 6: Draw landmarks and hand connections on the frame
+                mpDraw.draw_landmarks(frame, handLms, mpHand.HAND_CONNECTIONS)
 
+        # Step 7: Show the FPS and how long each stage took
+        timer.draw(frame)
 
     # Display the frame
-    cv.imshow("webcam", frame)
-    if cv.waitKey(1) & 0xFF == ord("q"):
+    with timer.stage("display"):
+        cv.imshow("webcam", frame)
+        key = cv.waitKey(1) & 0xFF
+    timer.frame()
+    if key == ord("q"):
         break
 
 # Step 10: Release resources and close the display window
@@ -58,5 +74,8 @@ cv.destroyAllWindows()
 # - **Step 2**: Initializes the hand-tracking module for detecting and tracking hands.
 # - **Step 5**: Reads frames in a loop to process each frame for hand detection.
 # - **Step 6**: Extracts landmark positions and draws them on the frame.
-# - **Step 7**: Calculates FPS to monitor performance.
+# - **Step 7**: Calculates FPS and the time of every stage (capture, convert, inference, drawing, display)
+#   to monitor performance. `StageTimer(dump_path="timings.csv")` also saves them every 5 seconds.
+# - **Replays**: pass a session recorded with 5.Video/3_record.py (add `--fast` to skip the recorded pacing)
+#   to measure changes on exactly the same frames.
 # - **Exit Condition**: Press 'q' to stop the loop and close the display.
@@ -1,7 +1,8 @@
 import cv2 as cv
-import mediapipe as mp
-import time
 from _handDetector_module import HandDetector  # Import custom HandDetector class
+from _frameGrabber_module import FrameGrabber  # Threaded webcam capture
+from _stageTimer_module import StageTimer  # Per-stage latency (p50 / p95 / p99) and FPS
+from _recording_module import source_from_argv  # Webcam, video file or recorded session from the command line
 
 # ================================
 # Hand Tracking with Custom HandDetector Class
@@ -9,19 +10,41 @@ from _handDetector_module import HandDetector  # Import custom HandDetector clas
 
 
 def main():
-    # Open the webcam
-    wc = cv.VideoCapture(0)
+    # Stage timings: capture, convert and inference (recorded by the detector), drawing, display.
+    # StageTimer(dump_path="timings.csv") also writes them to a file every 5 seconds; 't' toggles the overlay.
+    timer = StageTimer()
+    show_timings = True
 
     # Step 1: Initialize the custom HandDetector class
-    detector = HandDetector()
+    detector = HandDetector(timer=timer)
+    # Faster on CPU: full detection every 5 frames, ROI tracking in between (detector.lastPath tells which ran)
+    # detector = HandDetector(detect_every=5, timer=timer)
+    # Smoother landmarks (One-Euro filter), and half the inference: predicted landmarks on every second frame
+    # detector = HandDetector(landmark_filter=True, timer=timer)
+    # detector = HandDetector(infer_every=2, timer=timer)
+
+    # Load MediaPipe and prime the model in the background while the webcam opens (startup in parallel)
+    detector.warmUp()
+
+    # Open the webcam (frames are read on a background thread)
+    # (reuse_frames=True: frames are decoded into recycled arrays, HandDetector reuses its RGB buffer too)
+    # `python 2_hand_det_mod.py session/ --fast` replays a recorded session, every frame as fast as possible
+    source, mode = source_from_argv(default=0)
+    wc = FrameGrabber(source, mode=mode, reuse_frames=True)
 
     while True:
-        _, frame = wc.read()
+        with timer.stage("capture"):
+            ret, frame = wc.read()
+        if not ret:
+            break
 
         # Step 5: Process the frame for hand detection
-        detector.processHandImg(img=frame)       # Detect hands in the frame
-        detector.showLandMarks(img=frame)        # Draw landmarks on the frame
-        lm_list = detector.getLandmarksPosByIndex(img=frame, index=[4, 8,0])  # Get positions of specific landmarks
+        detector.processHandImg(img=frame, timestamp=wc.lastTimestamp)  # Detect hands in the frame
+        with timer.stage("drawing"):
+            detector.showLandMarks(img=frame)        # Draw landmarks on the frame
+            lm_list = detector.getLandmarksPosByIndex(img=frame, index=[4, 8,0])  # Get positions of specific landmarks
+            if show_timings:
+                timer.draw(frame)
 
         # Step 6: Print the landmark list (optional, for debugging purposes)
         # print(lm_list)
@@ -32,9 +55,14 @@ def main():
         #     print(lm_list[8])  # Example: print position of landmark with ID 8 (index fingertip)
 
         # Display the frame with landmarks and FPS
-        cv.imshow("webcam", frame)
-        if cv.waitKey(1) & 0xFF == ord("q"):
+        with timer.stage("display"):
+            cv.imshow("webcam", frame)
+            key = cv.waitKey(1) & 0xFF
+        timer.frame()
+        if key == ord("q"):
             break
+        if key == ord("t"):
+            show_timings = not show_timings
 
     # Step 10: Release resources and close the display window
     wc.release()
@@ -0,0 +1,71 @@
+import time
+
+import cv2 as cv
+import numpy as np
+from _handPipeline_module import HandPipeline  # capture / inference / drawing in separate processes
+from _landmarkFilter_module import LandmarkFilter  # smoothing + prediction of the landmarks
+from _overlay_module import Overlay
+
+# ================================
+# Hand Tracking as a Multi-Process Pipeline
+# ================================
+# 2_hand_det_mod.py does capture, hand detection, drawing and display one after the other, so every frame
+# takes the sum of all of them. Here the webcam is read in one process, MediaPipe runs in another, and this
+# process only draws and displays. Frames are passed through shared memory (no copies, no pickling) and
+# come back in order.
+
+
+def main():
+    # Step 1: Start the pipeline (workers=2 runs two MediaPipe processes for more FPS on multi-core CPUs)
+    with HandPipeline(0, width=640, height=480, workers=1) as pipe:
+        overlay = Overlay()
+        timer = pipe.timer      # already records end-to-end latency, inference time and FPS
+        landmarkFilter = LandmarkFilter()
+        size = np.array(pipe.shape[1::-1])      # (width, height) of the frames
+
+        # Step 2: Results arrive in frame order with the landmarks already computed
+        for result in pipe.frames():
+            frame = result.frame
+
+            # Step 3: Smooth the landmarks and move them forward from the capture time to now, so the
+            # drawing doesn't trail the hand by the pipeline's latency
+            landmarkFilter.update(result.landmarks, result.captureTime, result.handedness)
+            points = (landmarkFilter.predict(time.perf_counter())[:, :, :2] * size).astype(np.int32)
+
+            # Step 4: Draw the landmarks, fingertips and timings
+            with timer.stage("drawing"):
+                overlay.landmarks(points)
+                for hand in points:
+                    for cx, cy in hand[[4, 8]].tolist():
+                        overlay.circle((cx, cy), 25, (255, 0, 123), thickness=3)
+                overlay.render(frame)
+                timer.draw(frame)
+
+            # Step 5: Display the frame
+            with timer.stage("display"):
+                cv.imshow("webcam", frame)
+                key = cv.waitKey(1) & 0xFF
+            if key == ord("q"):
+                break
+
+        print(timer.summary())
+        print(f"frames dropped by capture (pipeline busy): {pipe.dropped}")
+
+    cv.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
+
+# ================================
+# Notes:
+# ================================
+# - The frame you get is a slot of the shared ring buffer: it is reused once you ask for the next frame,
+#   so copy it (frame.copy()) if you want to keep it.
+# - Throughput approaches that of the slowest stage (usually MediaPipe) instead of the sum of all stages.
+#   "end_to_end" in the overlay is the time from capture until the frame has been displayed.
+# - LandmarkFilter.predict() extrapolates the landmarks by up to 0.1 s with their filtered velocity, which hides
+#   most of that latency for the drawing; use result.landmarksPx directly for the raw model output.
+# - `python _handPipeline_module.py` compares the serial loop with the pipeline on synthetic frames.
+# - The `if __name__ == "__main__":` guard is required: the worker processes are started with "spawn",
+#   which re-imports this script.
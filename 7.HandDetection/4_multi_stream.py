@@ -0,0 +1,77 @@
+"""
+This script runs hand tracking on several video sources at once (webcams and/or video files). Every stream
+gets its own HandDetector, the streams are spread over a few worker processes pinned to separate CPU cores,
+and the per-stream FPS, inference time and number of hands are merged into one table (printed every few
+seconds) and, with --show, one window with a thumbnail of every stream.
+
+Run (from the "7.HandDetection" folder):
+    python 4_multi_stream.py 0 1                      # two webcams
+    python 4_multi_stream.py cam1.mp4 cam2.mp4 0 --workers 2 --show
+    python 4_multi_stream.py --test 4 --duration 20   # headless: 4 looping synthetic video files
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from functools import partial
+
+from _handDetector_module import HandDetector
+from _multiStream_module import MultiStreamRunner, make_test_videos
+from _overlay_module import Overlay
+
+
+# ================================
+# One hand detector per stream (created inside the worker process)
+# ================================
+class HandProcessor:
+    def __init__(self, **detector_kwargs):
+        self.detector = HandDetector(**detector_kwargs)
+        self.detector.warmUp()      # load the model while the stream opens
+        self.overlay = Overlay()
+
+    def process(self, frame):
+        self.detector.processHandImg(frame)
+        return {"hands": self.detector.numHands(), "handedness": self.detector.handedness}
+
+    # draw the last landmarks on a resized copy of the frame
+    def draw(self, image, scale=1.0):
+        if self.detector.numHands():
+            self.overlay.landmarks(self.detector.landmarksPx[:, :, 1:] * scale)
+            self.overlay.render(image)
+
+
+def hand_processor(**detector_kwargs):
+    return HandProcessor(**detector_kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hand tracking on several video sources at once.")
+    parser.add_argument("sources", nargs="*", help="webcam indexes and/or video files")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per stream, at most one per CPU)")
+    parser.add_argument("--no-pin", action="store_true", help="don't pin the workers to CPU cores")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    parser.add_argument("--show", action="store_true", help="show all streams in one window")
+    parser.add_argument("--test", type=int, default=0, help="add N looping synthetic test videos")
+    parser.add_argument("--detect-every", type=int, default=0, help="HandDetector detect_every (0 = full detection every frame)")
+    parser.add_argument("--report", default=None, help="write the final per-stream summary to this JSON file")
+    args = parser.parse_args()
+
+    sources = [int(source) if source.isdigit() else source for source in args.sources]
+    if args.test:
+        sources += make_test_videos(os.path.join(tempfile.gettempdir(), "multi_stream_test"), args.test)
+    if not sources:
+        sources = [0]
+
+    factory = partial(hand_processor, detect_every=args.detect_every)
+    runner = MultiStreamRunner(sources, factory, workers=args.workers, pin=not args.no_pin)
+    summary = runner.run(duration=args.duration, show=args.show)
+
+    print(runner.format_table())
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(summary, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
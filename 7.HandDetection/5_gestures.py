@@ -0,0 +1,77 @@
+import cv2 as cv
+from _frameGrabber_module import FrameGrabber
+from _gesture_module import GestureEngine  # Finger states, pinch, velocity and debounced gesture events
+from _handDetector_module import HandDetector
+from _recording_module import source_from_argv
+from _stageTimer_module import StageTimer
+
+# ================================
+# Gesture Events from Hand Landmarks
+# ================================
+# Instead of checking landmark lists every frame (is finger 8 above finger 6?), GestureEngine classifies all
+# hands at once and reports only the changes: "pinch start", "fist end", ... Each event knows how long
+# it took from the camera frame to the event.
+
+
+def main():
+    # "gestures" (classification) and "gesture_latency" (capture -> event) appear in the timing overlay
+    timer = StageTimer()
+    detector = HandDetector(landmark_filter=True, timer=timer)
+    detector.warmUp()       # load the model while the webcam opens
+
+    source, mode = source_from_argv(default=0)
+    wc = FrameGrabber(source, mode=mode, reuse_frames=True)
+    engine = GestureEngine(debounce=2, timer=timer)
+    log = []        # last few events, shown on the frame
+
+    while True:
+        with timer.stage("capture"):
+            ret, frame = wc.read()
+        if not ret:
+            break
+
+        # Step 1: Landmarks (smoothed, so fingers near the threshold don't flicker)
+        detector.processHandImg(frame, timestamp=wc.lastTimestamp)
+
+        # Step 2: Classify every hand and get the gestures that started or ended
+        events = engine.update(detector.landmarksPx[:, :, 1:], wc.lastTimestamp, detector.handedness)
+        for event in events:
+            if event.gesture in ("pinch", "fist", "open"):
+                print(f"{event.handedness} {event.gesture} {event.kind} ({event.latency * 1000:.0f} ms after capture)")
+            log = (log + [f"{event.handedness} {event.gesture} {event.kind}"])[-5:]
+
+        # Step 3: Draw the landmarks, the finger count of each hand and the last events
+        with timer.stage("drawing"):
+            detector.showLandMarks(frame)
+            for hand, count in enumerate(engine.counts.tolist()):
+                _Id, cx, cy = detector.landmarksPx[hand, 0].tolist()
+                label = f"{count}" + (" pinch" if engine.isActive("pinch", hand) else "")
+                cv.putText(frame, label, (cx - 20, cy + 40), cv.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 3, cv.LINE_AA)
+            for i, line in enumerate(log):
+                cv.putText(frame, line, (10, frame.shape[0] - 20 - 22 * i), cv.FONT_HERSHEY_SIMPLEX, 0.6,
+                           (255, 255, 255), 2, cv.LINE_AA)
+            timer.draw(frame)
+
+        with timer.stage("display"):
+            cv.imshow("webcam", frame)
+            key = cv.waitKey(1) & 0xFF
+        timer.frame()
+        if key == ord("q"):
+            break
+
+    print(timer.summary())
+    wc.release()
+    cv.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
+
+# ================================
+# Notes:
+# ================================
+# - engine.extended (num_hands, 5), engine.counts, engine.pinchDistance and engine.velocity (pixels / second)
+#   hold the per-frame values; engine.isActive("pinch", hand) the debounced state.
+# - debounce=2 means a gesture must be seen on 2 frames in a row before it fires (one frame of extra
+#   latency, no events from single noisy frames). The pinch starts below 0.35 hand sizes and ends above 0.5.
+# - `python _gesture_module.py` runs a synthetic sequence and measures the classification time.
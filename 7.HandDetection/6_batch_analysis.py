@@ -0,0 +1,90 @@
+"""
+This script runs hand tracking over an archived video file (or a session recorded with 5.Video/3_record.py)
+as fast as possible: the file is split into chunks that are decoded and processed in parallel worker
+processes, each with its own HandDetector, and the landmarks of every frame are written, in frame order, to
+one JSON-lines file.
+
+Run (from the "7.HandDetection" folder):
+    python 6_batch_analysis.py session.mp4                    # -> session.mp4.jsonl, one worker per CPU
+    python 6_batch_analysis.py session.mp4 -o hands.jsonl --workers 8 --warmup 60
+    python 6_batch_analysis.py --test 20                      # headless: a 20 s synthetic video
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from functools import partial
+
+from _batchAnalyzer_module import BatchAnalyzer, make_test_video
+from _handDetector_module import HandDetector
+
+
+# ================================
+# One hand detector per worker process
+# ================================
+class HandBatchProcessor:
+    def __init__(self, **detector_kwargs):
+        self.detector = HandDetector(**detector_kwargs)
+        self.detector.warmUp()      # load the model while the worker opens its first chunk
+
+    # the chunk starts somewhere else in the file: drop the filter state of the previous chunk (MediaPipe's
+    # own tracking picks the hands up again during the warm-up frames)
+    def reset(self):
+        if self.detector.landmarkFilter is not None:
+            self.detector.landmarkFilter.reset()
+
+    # timestamp: position in the video (seconds), so filtering follows video time, not processing time
+    def process(self, frame, timestamp):
+        self.detector.processHandImg(frame, timestamp=timestamp)
+        return {"hands": self.detector.numHands(), "handedness": self.detector.handedness,
+                "landmarks": self.detector.landmarksPx[:, :, 1:].tolist()}
+
+
+def hand_batch_processor(**detector_kwargs):
+    return HandBatchProcessor(**detector_kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hand tracking over a video file, in parallel chunks.")
+    parser.add_argument("video", nargs="?", help="video file or recording directory")
+    parser.add_argument("-o", "--output", default=None, help="JSON-lines output (default: <video>.jsonl)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunks-per-worker", type=int, default=4, help="chunks per worker (load balancing)")
+    parser.add_argument("--warmup", type=int, default=30, help="frames processed before each chunk without output")
+    parser.add_argument("--no-filter", action="store_true", help="raw landmarks (no One-Euro filtering)")
+    parser.add_argument("--test", type=float, default=0, help="analyse a synthetic video of this many seconds")
+    parser.add_argument("--report", default=None, help="write the run summary to this JSON file")
+    args = parser.parse_args()
+
+    video = args.video
+    if args.test:
+        video = make_test_video(os.path.join(tempfile.gettempdir(), "batch_test.avi"), seconds=args.test)
+    if video is None:
+        parser.error("give a video file (or --test SECONDS)")
+
+    factory = partial(hand_batch_processor, landmark_filter=None if args.no_filter else True)
+    analyzer = BatchAnalyzer(video, factory, workers=args.workers, chunks_per_worker=args.chunks_per_worker,
+                             warmup=args.warmup)
+    summary = analyzer.run(args.output or video.rstrip("/\\") + ".jsonl")
+
+    print(f"{summary['frames']} frames in {summary['seconds']:.1f} s: {summary['fps']:.0f} FPS, "
+          f"{summary['speed']:.1f}x real time ({summary['workers']} workers, {summary['chunks']} chunks"
+          f"{', keyframe-aligned' if summary['keyframe_aligned'] else ''})")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
+
+# ================================
+# Notes:
+# ================================
+# - Output: one line per frame, e.g. {"frame": 1234, "time": 41.1333, "hands": 1, "handedness": ["Right"],
+#   "landmarks": [[[x, y], ... 21 points]]}, in frame order whatever the number of workers.
+# - Each worker loads its own MediaPipe model once (about one model's memory per worker).
+# - Chunks start at keyframes when ffprobe is installed (cheap seeking); without it the frames are split evenly.
+# - --warmup frames before each chunk are processed without output, so MediaPipe's tracking and the landmark
+#   filter have settled when the chunk starts, as in one sequential pass over the file.
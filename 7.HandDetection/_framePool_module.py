@@ -0,0 +1,133 @@
+"""
+This module defines `FramePool`, a set of preallocated frame buffers for live frame loops, and
+`AllocationMonitor`, a debug counter that shows whether a loop still allocates frame-sized arrays.
+
+Every `cv.flip(frame, 1)`, `cv.cvtColor(...)` or `cv.inRange(...)` without `dst=` returns a new array. In a
+webcam loop that is a new full-size array per call per frame (at 1080p60, a 1080p BGR frame is 6 MB, so
+hundreds of MB/s of short-lived allocations), which shows up as frame-time spikes from the allocator and
+the garbage collector. Passing a buffer from the pool as `dst=` makes OpenCV write into it instead:
+
+    pool = FramePool()
+    while True:
+        ret, frame = webcam.read()
+        frame = cv.flip(frame, 1, dst=pool.like("flip", frame))
+        hsv = cv.cvtColor(frame, cv.COLOR_BGR2HSV, dst=pool.like("hsv", frame))
+        mask = cv.inRange(hsv, lower, upper, dst=pool.get("mask", frame.shape[:2]))
+
+Buffers are keyed by (name, shape, dtype): the first frame allocates them, every later frame of the same
+size reuses them. `pool.allocations` counts how many buffers were ever created, so after warm-up it must
+stop growing.
+
+Note: a buffer is overwritten by the next frame, copy it if you need to keep it.
+
+`AllocationMonitor` proves it from the outside with tracemalloc (which sees NumPy and OpenCV arrays):
+wrap the loop body in `with monitor:` and `monitor.spikes` counts the iterations in which any array of at
+least `min_bytes` was allocated (kept or temporary).
+"""
+
+import time
+import tracemalloc
+from collections import OrderedDict
+
+import numpy as np
+
+
+class FramePool:
+    def __init__(self, max_buffers=32):
+        self.max_buffers = max_buffers      # least recently used buffers beyond this are dropped
+        self._buffers = OrderedDict()
+
+        # Debug counters
+        self.allocations = 0
+        self.bytes_allocated = 0
+
+    # buffer for (name, shape, dtype), allocated on first use
+    def get(self, name, shape, dtype=np.uint8):
+        key = (name, tuple(shape), np.dtype(dtype))
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = np.empty(key[1], dtype=key[2])
+            self._buffers[key] = buffer
+            self.allocations += 1
+            self.bytes_allocated += buffer.nbytes
+            if len(self._buffers) > self.max_buffers:
+                self._buffers.popitem(last=False)
+        else:
+            self._buffers.move_to_end(key)
+        return buffer
+
+    # buffer with the same shape and dtype as an existing array
+    def like(self, name, array):
+        return self.get(name, array.shape, array.dtype)
+
+    def clear(self):
+        self._buffers.clear()
+
+    def __len__(self):
+        return len(self._buffers)
+
+
+class AllocationMonitor:
+    def __init__(self, min_bytes=64 * 1024):
+        self.min_bytes = min_bytes      # smaller allocations (Python objects, landmark arrays) are ignored
+        self.iterations = 0
+        self.spikes = 0                 # iterations that allocated at least min_bytes
+        self.max_bytes = 0              # largest extra memory held at once during one iteration
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        return self
+
+    def __exit__(self, *exc):
+        extra = tracemalloc.get_traced_memory()[1] - self._baseline
+        self.iterations += 1
+        self.max_bytes = max(self.max_bytes, extra)
+        if extra >= self.min_bytes:
+            self.spikes += 1
+
+    def stop(self):
+        tracemalloc.stop()
+
+
+# Headless benchmark: the 6.ColorDetection loop body (flip, HSV, inRange) on 1080p frames,
+# without and with the pool
+if __name__ == "__main__":
+    import cv2 as cv
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8) for _ in range(4)]
+    lower, upper = np.array([20, 100, 100], np.uint8), np.array([40, 255, 255], np.uint8)
+    pool = FramePool()
+
+    def without_pool(frame):
+        frame = cv.flip(frame, 1)
+        hsv = cv.cvtColor(frame, cv.COLOR_BGR2HSV)
+        return cv.inRange(hsv, lower, upper)
+
+    def with_pool(frame):
+        frame = cv.flip(frame, 1, dst=pool.like("flip", frame))
+        hsv = cv.cvtColor(frame, cv.COLOR_BGR2HSV, dst=pool.like("hsv", frame))
+        return cv.inRange(hsv, lower, upper, dst=pool.get("mask", frame.shape[:2]))
+
+    for name, body in (("without pool", without_pool), ("with pool", with_pool)):
+        body(frames[0])     # warm-up (the pool allocates its buffers here)
+
+        times = []
+        for i in range(200):
+            start = time.perf_counter()
+            body(frames[i % len(frames)])
+            times.append(time.perf_counter() - start)
+
+        monitor = AllocationMonitor()
+        for i in range(50):
+            with monitor:
+                body(frames[i % len(frames)])
+        monitor.stop()
+
+        p50, p99 = np.percentile(times, [50, 99]) * 1000
+        print(f"{name:>12}: p50 {p50:.2f} ms, p99 {p99:.2f} ms, iterations allocating frames: "
+              f"{monitor.spikes}/{monitor.iterations} (largest {monitor.max_bytes / 1e6:.1f} MB)")
+    print(f"pool buffers allocated: {pool.allocations} ({pool.bytes_allocated / 1e6:.1f} MB)")
@@ -0,0 +1,182 @@
+"""
+This module turns HandDetector landmarks into gesture states and debounced gesture events.
+
+Games usually poll a few landmark lists every frame and compare co-ordinates in Python (is the index tip
+above its knuckle? are thumb and index close?). `GestureEngine.update()` evaluates all of it for all hands
+at once on the (num_hands, 21, 2) pixel landmark array, in a handful of NumPy operations:
+
+- extended: (num_hands, 5) bool, thumb to pinky. A finger is extended when its tip is farther from the
+  wrist than its middle joint (thumb: tip farther from the pinky knuckle than the thumb's IP joint), so it
+  works for any hand rotation.
+- counts: (num_hands,) number of extended fingers
+- pinchDistance: (num_hands,) thumb tip to index tip, divided by the hand size (wrist to middle knuckle),
+  so it doesn't depend on the distance to the camera
+- velocity: (num_hands, 2) palm centre speed in pixels per second
+- active: (num_hands, len(GESTURES)) debounced gesture states
+
+Instead of polling, use the events `update()` returns: a `GestureEvent` whenever a gesture starts or ends
+on a hand. A gesture only changes state after its raw per-frame value has differed for `debounce`
+consecutive frames, so a single noisy frame never fires an event; the pinch uses two thresholds
+(hysteresis) so it doesn't flicker at the boundary.
+
+Latency: every event carries the capture time of the frame where the gesture first appeared (`timestamp`)
+and `latency`, the time from then until the event was emitted (inference + debounce + classification).
+Pass a StageTimer to record it as the "gesture_latency" stage (and the classification as "gestures").
+
+    engine = GestureEngine()
+    for event in engine.update(detector.landmarksPx[:, :, 1:], timestamp, detector.handedness):
+        if event.gesture == "pinch" and event.kind == "start":
+            ...
+"""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+from _stageTimer_module import StageTimer
+
+# Debounced gestures, in the column order of GestureEngine.active
+GESTURES = ("thumb", "index", "middle", "ring", "pinky", "pinch", "fist", "open")
+
+# hand: index in the landmark array; kind: "start" or "end"; timestamp: capture time of the first frame
+# showing the new state; latency: seconds from that capture until the event was emitted
+GestureEvent = namedtuple("GestureEvent", "hand handedness gesture kind timestamp latency")
+
+# All distances of a frame come from one gather: landmark pairs (_FROM[i], _TO[i]) are
+#  0-4:  finger tips to their reference point (pinky knuckle for the thumb, wrist for the fingers)
+#  5-9:  middle joints (thumb IP, finger PIP) to the same reference points
+#  10:   wrist to middle knuckle (hand size), 11: thumb tip to index tip (pinch)
+_FROM = np.array([4, 8, 12, 16, 20, 3, 6, 10, 14, 18, 9, 4])
+_TO = np.array([17, 0, 0, 0, 0, 17, 0, 0, 0, 0, 0, 8])
+_PALM = np.array([0, 5, 9, 13, 17])         # wrist and knuckles, averaged for the palm centre
+
+
+class GestureEngine:
+    # pinch_on / pinch_off: normalized thumb-index distance below which a pinch starts / above which it ends
+    def __init__(self, debounce=2, pinch_on=0.35, pinch_off=0.5, timer=None):
+        self.debounce = max(1, debounce)
+        self.pinch_on = pinch_on
+        self.pinch_off = pinch_off
+        self.timer = timer if timer is not None else StageTimer(enabled=False)
+        self._reset(0)
+
+    def _reset(self, num_hands):
+        self.extended = np.zeros((num_hands, 5), dtype=bool)
+        self.counts = np.zeros(num_hands, dtype=np.int64)
+        self.pinchDistance = np.zeros(num_hands)
+        self.velocity = np.zeros((num_hands, 2))
+        self.active = np.zeros((num_hands, len(GESTURES)), dtype=bool)
+        self.handedness = []
+        self._pending = np.zeros((num_hands, len(GESTURES)), dtype=np.int64)    # frames the raw value differed
+        self._onset = np.zeros((num_hands, len(GESTURES)))                      # capture time it started to differ
+        self._palm = None
+        self._time = None
+
+    # classify one frame of (num_hands, 21, 2) pixel landmarks captured at `timestamp` (default: now);
+    # returns the list of GestureEvents it triggered
+    def update(self, landmarks, timestamp=None, handedness=None):
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        handedness = list(handedness) if handedness is not None else []
+        events = []
+        with self.timer.stage("gestures"):
+            points = np.asarray(landmarks, dtype=np.float64)[:, :, -2:]
+            if len(points) != len(self.active) or handedness != self.handedness:
+                # hands appeared, disappeared or switched: end what was active on the old ones
+                events += self._endAll(timestamp)
+                self._reset(len(points))
+                self.handedness = handedness
+            if not len(points):
+                return self._emit(events)
+
+            # squared distances of all landmark pairs at once
+            delta = points[:, _FROM] - points[:, _TO]
+            squared = np.einsum("hij,hij->hi", delta, delta)
+
+            # finger states: tip farther from the reference point than the middle joint
+            self.extended = squared[:, :5] > squared[:, 5:10]
+            self.counts = np.count_nonzero(self.extended, axis=1)
+
+            # pinch distance in hand sizes
+            self.pinchDistance = np.sqrt(squared[:, 11] / np.maximum(squared[:, 10], 1e-12))
+
+            # palm velocity
+            palm = np.add.reduce(points[:, _PALM], axis=1) / len(_PALM)
+            if self._palm is not None and timestamp > self._time:
+                self.velocity = (palm - self._palm) / (timestamp - self._time)
+            self._palm, self._time = palm, timestamp
+
+            # raw gesture values of this frame; the pinch keeps its state between the two thresholds
+            raw = np.empty_like(self.active)
+            raw[:, :5] = self.extended
+            raw[:, 5] = self.pinchDistance < np.where(self.active[:, 5], self.pinch_off, self.pinch_on)
+            raw[:, 6] = self.counts == 0
+            raw[:, 7] = self.counts == 5
+
+            # debounce: count consecutive frames in which the raw value differs from the active state
+            changed = raw != self.active
+            self._onset[changed & (self._pending == 0)] = timestamp
+            self._pending += 1
+            self._pending *= changed
+            flips = self._pending >= self.debounce
+            if flips.any():
+                self.active ^= flips
+                self._pending[flips] = 0
+                now = time.perf_counter()
+                for hand, gesture in zip(*np.nonzero(flips)):
+                    onset = float(self._onset[hand, gesture])
+                    events.append(GestureEvent(int(hand), self._label(hand), GESTURES[gesture],
+                                               "start" if self.active[hand, gesture] else "end", onset, now - onset))
+        return self._emit(events)
+
+    def _label(self, hand):
+        return self.handedness[hand] if hand < len(self.handedness) else None
+
+    # "end" events for every active gesture (the hands they belong to are gone)
+    def _endAll(self, timestamp):
+        now = time.perf_counter()
+        return [GestureEvent(int(hand), self._label(hand), GESTURES[gesture], "end", timestamp, now - timestamp)
+                for hand, gesture in zip(*np.nonzero(self.active))]
+
+    def _emit(self, events):
+        for event in events:
+            self.timer.add("gesture_latency", event.latency)
+        return events
+
+    # debounced state of a gesture on a hand
+    def isActive(self, gesture, hand=0):
+        return hand < len(self.active) and bool(self.active[hand, GESTURES.index(gesture)])
+
+
+# Headless check: synthetic hands opening, closing and pinching; classification time per frame
+if __name__ == "__main__":
+    # a flat hand pointing up, all fingers extended (pixel co-ordinates)
+    open_hand = np.zeros((21, 2))
+    open_hand[0] = (320, 400)
+    for finger, x in enumerate((240, 290, 320, 350, 380)):
+        open_hand[1 + 4 * finger:5 + 4 * finger] = [(320 + (x - 320) * k, 400 - 45 * k) for k in (1, 2, 3, 4)]
+    open_hand[1:5] = [(290, 380), (260, 360), (235, 345), (210, 330)]     # thumb out to the side
+
+    fist = open_hand.copy()
+    for finger in range(1, 5):
+        mcp = open_hand[1 + 4 * finger]
+        fist[2 + 4 * finger:5 + 4 * finger] = mcp + [(0, -15), (0, 5), (0, 25)]   # fingers curled towards the wrist
+    fist[2:5] = [(270, 370), (290, 350), (330, 350)]                            # thumb across the palm
+
+    pinch = open_hand.copy()
+    pinch[4] = pinch[8] + (4, 4)                                            # thumb tip on the index tip
+
+    rng = np.random.default_rng(0)
+    sequence = [open_hand] * 5 + [fist] * 5 + [fist, open_hand, fist] + [fist] * 3 + [pinch] * 5 + [open_hand] * 5
+    engine = GestureEngine()
+    for frame, hand in enumerate(sequence):
+        noisy = hand + rng.normal(0, 1.0, hand.shape)
+        for event in engine.update(noisy[None], frame / 30, ["Right"]):
+            print(f"frame {frame:2d}: {event.gesture:<6} {event.kind}")
+
+    hands = np.stack([open_hand, pinch])
+    engine = GestureEngine()
+    runs = 20000
+    start = time.perf_counter()
+    for i in range(runs):
+        engine.update(hands, i / 30, ["Left", "Right"])
+    print(f"classification, 2 hands: {(time.perf_counter() - start) / runs * 1e6:.1f} us per frame")
@@ -1,84 +1,352 @@
+import threading
+import time
+
 import cv2 as cv
-import mediapipe as mp
+import numpy as np
+from _framePool_module import FramePool
+from _landmarkFilter_module import LandmarkFilter
+from _overlay_module import Overlay
+from _stageTimer_module import StageTimer
+
+
+# MediaPipe is imported on first use, not with this module: it pulls in a large dependency stack and
+# takes seconds to import, which scripts can overlap with opening the camera (see HandDetector.warmUp)
+def _mediapipe():
+    import mediapipe
+    return mediapipe
 
 
 class HandDetector:
-    def __init__(self, mode=False, max_hands=2, detection_conf=0.5, track_conf=0.5):
-        # hand object
-        self.mpHand = mp.solutions.hands
-        self.hands = self.mpHand.Hands(
+    # detect_every=N: run full-frame detection every N frames and, in between, run landmark inference only on a
+    # cropped, downscaled region around the last hands (roi_size pixels on its longer side, bbox grown by roi_margin).
+    # A tracked frame falls back to full detection when a hand is lost or its score drops below min_track_score.
+    # timer: a StageTimer to record the "convert" (BGR -> RGB) and "inference" stages in.
+    # landmark_filter: a LandmarkFilter (True for the default one, False for none) smoothing the landmarks over time; the raw
+    # model output stays available in rawLandmarks. infer_every=N runs the model on every N-th frame only and
+    # predicts the landmarks of the frames in between from the filter's velocity (lastPath == "predict").
+    # The MediaPipe models are built on the first processHandImg call, or in the background by warmUp().
+    def __init__(self, mode=False, max_hands=2, detection_conf=0.5, track_conf=0.5,
+                 detect_every=0, roi_size=256, roi_margin=0.25, min_track_score=0.8, timer=None,
+                 landmark_filter=None, infer_every=1):
+        # hand object (built lazily, see _build)
+        self._handsKwargs = dict(
             static_image_mode=mode,
             max_num_hands=max_hands,
             min_detection_confidence=detection_conf,
             min_tracking_confidence=track_conf
         )
+        self.hands = None
+        self._buildLock = threading.Lock()
+        self._warmUpThread = None
+        self.startupTimes = {}                          # seconds: "import", "build", "first_inference"
 
         # Draw LandMarks object
-        self.mpDraw = mp.solutions.drawing_utils
+        self.overlay = Overlay()
+
+        # Detect-once-then-track scheduler (off when detect_every=0)
+        self.detect_every = detect_every
+        self.roi_size = roi_size
+        self.roi_margin = roi_margin
+        self.min_track_score = min_track_score
+        self.roiHands = None
+        # RGB / ROI buffers reused from frame to frame (cvtColor and resize write into them)
+        self.pool = FramePool()
+        self.timer = timer if timer is not None else StageTimer(enabled=False)
+
+        # Temporal smoothing / prediction (off unless a filter is given or inference is skipped)
+        if landmark_filter is True or (landmark_filter is None and infer_every > 1):
+            landmark_filter = LandmarkFilter()
+        elif not landmark_filter:
+            if infer_every > 1:
+                raise ValueError("infer_every > 1 predicts the skipped frames and needs a landmark_filter")
+            landmark_filter = None      # False: explicitly off
+        self.landmarkFilter = landmark_filter
+        self.infer_every = max(1, infer_every)
+        self._sinceInfer = 0
+
+        self.lastPath = None                            # "detect", "track" or "predict": what ran on the last frame
+        self.pathCounts = {"detect": 0, "track": 0, "predict": 0}
+        self._roi = None                                # (x1, y1, x2, y2) pixel box around the last hands
+        self._sinceDetect = 0
+
+        # Landmark arrays, filled once per frame by processHandImg
+        self.result = None
+        self._setLandmarks(np.empty((0, 21, 3), dtype=np.float32), (1, 1))
+        self.rawLandmarks = self.landmarks              # model output before filtering
+
+    @property
+    def mpHand(self):
+        return _mediapipe().solutions.hands
+
+    @property
+    def mpDraw(self):
+        return _mediapipe().solutions.drawing_utils
+
+    # import MediaPipe and create the model(s), once
+    def _build(self):
+        with self._buildLock:
+            if self.hands is not None:
+                return
+            start = time.perf_counter()
+            mpHand = _mediapipe().solutions.hands
+            imported = time.perf_counter()
+            hands = mpHand.Hands(**self._handsKwargs)
+            if self.detect_every:
+                # separate model instance so the ROI crops don't disturb the full-frame tracking state
+                self.roiHands = mpHand.Hands(**self._handsKwargs)
+            self.startupTimes["import"] = imported - start
+            self.startupTimes["build"] = time.perf_counter() - imported
+            self.hands = hands
+
+    # Build the model(s) and run them once on a blank frame, in a background thread (block=False) so the
+    # import, graph set-up and first-inference cost overlap with opening the camera. processHandImg waits
+    # for it to finish. shape: (height, width, 3) of the frames that will follow.
+    def warmUp(self, shape=(480, 640, 3), block=False):
+        if self._warmUpThread is None and "first_inference" not in self.startupTimes:
+            self._warmUpThread = threading.Thread(target=self._warmUp, args=(shape,), name="HandDetector-warmUp",
+                                                  daemon=True)
+            self._warmUpThread.start()
+        if block and self._warmUpThread is not None:
+            self._warmUpThread.join()
+        return self._warmUpThread
+
+    def _warmUp(self, shape):
+        self._build()
+        start = time.perf_counter()
+        self.hands.process(np.zeros(shape, dtype=np.uint8))
+        if self.roiHands is not None:
+            self.roiHands.process(np.zeros((self.roi_size, self.roi_size, 3), dtype=np.uint8))
+        self.startupTimes["first_inference"] = time.perf_counter() - start
+        # the blank frame leaves no tracking state behind (no hands were found)
 
-    # process hand
-    def processHandImg(self, img):
+    # True when the model(s) are built and warm
+    def ready(self):
+        return self.hands is not None and (self._warmUpThread is None or not self._warmUpThread.is_alive())
+
+    # process hand; timestamp: capture time of img in seconds (e.g. FrameGrabber.lastTimestamp), default: now
+    def processHandImg(self, img, timestamp=None):
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        if self.hands is None or self._warmUpThread is not None:
+            self._ensureModel()
+        if self.infer_every > 1 and self._sinceInfer < self.infer_every and self.landmarkFilter.lastTime() is not None:
+            self._sinceInfer += 1
+            self.predictLandmarks(img, timestamp)
+            return
+        self._sinceInfer = 1
+
+        tracked = False
+        if self.detect_every and self._roi is not None and self._sinceDetect < self.detect_every:
+            tracked = self._trackRoi(img)
+
+        if tracked:
+            self._sinceDetect += 1
+            self.lastPath = "track"
+        else:
+            self._detect(img)
+            self._sinceDetect = 1
+            self.lastPath = "detect"
+        self.pathCounts[self.lastPath] += 1
+
+        if self.detect_every:
+            self._roi = self._handsBox(img.shape) if self.numHands() else None
+
+        self.rawLandmarks = self.landmarks
+        if self.landmarkFilter is not None:
+            self._setLandmarks(self.landmarkFilter.update(self.landmarks, timestamp, self.handedness), img.shape)
+
+        # return img
+
+    # landmarks of img without running the model: extrapolated from the filtered motion up to timestamp
+    # (for frames whose inference was skipped or is still running elsewhere; needs landmark_filter)
+    def predictLandmarks(self, img, timestamp=None):
+        if self.landmarkFilter is None:
+            return
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        self._setLandmarks(self.landmarkFilter.predict(timestamp), img.shape)
+        self.lastPath = "predict"
+        self.pathCounts["predict"] += 1
+
+    # wait for a running warm-up, or build the model(s) now
+    def _ensureModel(self):
+        if self._warmUpThread is not None:
+            self._warmUpThread.join()
+            self._warmUpThread = None
+        if self.hands is None:
+            self._build()
+
+    # full-frame detection
+    def _detect(self, img):
         # Convert BGR image to RGB
-        rgb_img = cv.cvtColor(src=img, code=cv.COLOR_BGR2RGB)
+        with self.timer.stage("convert"):
+            rgb_img = cv.cvtColor(src=img, code=cv.COLOR_BGR2RGB, dst=self.pool.like("rgb", img))
 
         # Process the Image
-        self.result = self.hands.process(rgb_img)
+        with self.timer.stage("inference"):
+            first = "first_inference" not in self.startupTimes
+            start = time.perf_counter()
+            self.result = self.hands.process(rgb_img)
+            if first:
+                self.startupTimes["first_inference"] = time.perf_counter() - start
 
-        # return img
+        # Convert the protobuf results to NumPy arrays once, so the getters below are just slices
+        self._setLandmarks(self._resultArray(self.result), img.shape)
 
-    #  draw land mark
-    def showLandMarks(self, img):
-        if self.result.multi_hand_landmarks:
-            # Extract landmarks for each hands
-            for handLandmarks in self.result.multi_hand_landmarks:
-                # Draw landmarks on the image
-                self.mpDraw.draw_landmarks(
-                    img, handLandmarks, self.mpHand.HAND_CONNECTIONS)
+    # landmark inference on the region around the last hands, returns False when tracking was lost
+    def _trackRoi(self, img):
+        x1, y1, x2, y2 = self._roi
+        crop = img[y1:y2, x1:x2]
 
-    # x, y pixel co-ordinate of all the indexes (0-20) of a certain hand
-    def getAllLandmarksPos(self, img, handNum=0):
+        # downscale the crop so its longer side is at most roi_size
+        with self.timer.stage("convert"):
+            scale = min(1.0, self.roi_size / max(crop.shape[:2]))
+            if scale < 1.0:
+                size = (max(1, int(crop.shape[1] * scale)), max(1, int(crop.shape[0] * scale)))
+                crop = cv.resize(crop, size, dst=self.pool.get("roi", (size[1], size[0], 3)), interpolation=cv.INTER_AREA)
+            rgb_crop = cv.cvtColor(src=crop, code=cv.COLOR_BGR2RGB, dst=self.pool.like("roiRgb", crop))
 
-        landmark_List = []
+        with self.timer.stage("inference"):
+            result = self.roiHands.process(rgb_crop)
+        if not result.multi_hand_landmarks or len(result.multi_hand_landmarks) < self.numHands():
+            return False
+        if min(hand.classification[0].score for hand in result.multi_handedness) < self.min_track_score:
+            return False
 
-        if self.result.multi_hand_landmarks:
-            # choose one hand
-            hand = self.result.multi_hand_landmarks[handNum]
+        # map the crop's normalized co-ordinates back to the full frame
+        height, width = img.shape[:2]
+        offset = np.array([x1 / width, y1 / height], dtype=np.float64)
+        size = np.array([(x2 - x1) / width, (y2 - y1) / height], dtype=np.float64)
+        landmarks = self._resultArray(result).astype(np.float64)
+        landmarks[:, :, :2] = landmarks[:, :, :2] * size + offset
 
+        # write them back into the protobuf too, so showLandMarks draws in full-frame co-ordinates
+        for hand, points in zip(result.multi_hand_landmarks, landmarks):
+            for lm, (x, y, _z) in zip(hand.landmark, points):
+                lm.x, lm.y = x, y
 
-            # Get landmarks for each detected hand
-            for Id, landmark in enumerate(hand.landmark):
-                # Note: landmark has normalized x, y, and z coordinates (values between 0 and 1)
-                height, width, _channels = img.shape  # Get image dimensions
-                # Convert normalized coordinates to pixel values
-                cx, cy = int(landmark.x * width), int(landmark.y * height)
+        self.result = result
+        self._setLandmarks(landmarks.astype(np.float32), img.shape)
+        return True
 
-                # Append landmark ID and pixel coordinates to the list
-                landmark_List.append([Id, cx, cy])
+    # (num_hands, 21, 3) normalized landmarks of a MediaPipe result
+    @staticmethod
+    def _resultArray(result):
+        if not result.multi_hand_landmarks:
+            return np.empty((0, 21, 3), dtype=np.float32)
+        return np.array(
+            [[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in result.multi_hand_landmarks],
+            dtype=np.float32)
+
+    # square pixel box around all detected hands, grown by roi_margin and clipped to the image
+    def _handsBox(self, shape):
+        height, width = shape[:2]
+        points = self.landmarksPx[:, :, 1:].reshape(-1, 2)
+        (xmin, ymin), (xmax, ymax) = points.min(axis=0), points.max(axis=0)
+
+        half = max(xmax - xmin, ymax - ymin) * (0.5 + self.roi_margin)
+        cx, cy = (xmin + xmax) / 2, (ymin + ymax) / 2
+        x1, y1 = max(0, int(cx - half)), max(0, int(cy - half))
+        x2, y2 = min(width, int(cx + half) + 1), min(height, int(cy + half) + 1)
+        if x2 - x1 < 2 or y2 - y1 < 2:
+            return None
+        return x1, y1, x2, y2
+
+    # cache normalized (x, y, z), pixel [Id, cx, cy] and handedness arrays for the current frame
+    def _setLandmarks(self, landmarks, shape):
+        height, width = shape[:2]
+        num_hands = len(landmarks)
+
+        # (num_hands, 21, 3) normalized x, y, z (values between 0 and 1, z relative to the wrist)
+        self.landmarks = landmarks
+
+        # (num_hands, 21, 3) [Id, cx, cy] pixel co-ordinates, int() truncation like before
+        self.landmarksPx = np.empty((num_hands, 21, 3), dtype=np.int32)
+        self.landmarksPx[:, :, 0] = np.arange(21)
+        self.landmarksPx[:, :, 1:] = np.multiply(landmarks[:, :, :2], (width, height), dtype=np.float64)
+
+        # (num_hands,) "Left" / "Right" labels and their scores
+        self.handedness = []
+        self.handednessScore = np.zeros(num_hands, dtype=np.float32)
+        if num_hands and self.result.multi_handedness:
+            for i, hand in enumerate(self.result.multi_handedness[:num_hands]):
+                self.handedness.append(hand.classification[0].label)
+                self.handednessScore[i] = hand.classification[0].score
+
+    # number of hands found in the last processed frame
+    def numHands(self):
+        return len(self.landmarks)
+
+    #  draw land mark
+    # All hands are drawn from the landmark array in a few batched calls (same style as mpDraw.draw_landmarks).
+    # Pass your own Overlay to collect them with the rest of the frame's annotations and render once.
+    def showLandMarks(self, img, overlay=None):
+        if not self.numHands():
+            return
+        target = self.overlay if overlay is None else overlay
+        target.landmarks(self.landmarksPx[:, :, 1:])
+        if overlay is None:
+            self.overlay.render(img)
+
+    # (21, 3) array of a certain hand: [Id, cx, cy] pixels, or normalized x, y, z with normalized=True
+    def getLandmarksArray(self, handNum=0, index=None, normalized=False):
+        if handNum >= self.numHands():
+            return np.empty((0, 3), dtype=np.float32 if normalized else np.int32)
+
+        hand = self.landmarks[handNum] if normalized else self.landmarksPx[handNum]
+        return hand if index is None else hand[index]
+
+    # x, y pixel co-ordinate of all the indexes (0-20) of a certain hand
+    def getAllLandmarksPos(self, img, handNum=0):
+        # [[Id, cx, cy], ...] (img is kept for compatibility, the pixel co-ordinates are computed in processHandImg)
+        return self.getLandmarksArray(handNum).tolist()
 
-        return landmark_List
-    
     # x, y pixel co-ordinate of ceratin indexes of a certain hand
     def getLandmarksPosByIndex(self, img, handNum=0, index=[0], drawIndex=True, radius=25, color=(255,0,123)):
 
-        landmark_List = []
+        # landmark order (ascending Id), each Id once, like the original per-landmark loop
+        index = np.unique(np.asarray(index, dtype=np.int64))
+        index = index[(index >= 0) & (index < 21)]
+        landmark_List = self.getLandmarksArray(handNum, index=index).tolist()
 
-        if self.result.multi_hand_landmarks:
-            # choose one hand
-            hand = self.result.multi_hand_landmarks[handNum]
+        if drawIndex:
+            for _Id, cx, cy in landmark_List:
+                cv.circle(img=img, center=(cx, cy), radius=radius, color=color, thickness=3)
 
+        return landmark_List
 
-            # Get landmarks for each detected hand
-            for Id, landmark in enumerate(hand.landmark):
-                # Note: landmark has normalized x, y, and z coordinates (values between 0 and 1)
-                height, width, _channels = img.shape  # Get image dimensions
-                # Convert normalized coordinates to pixel values
-                cx, cy = int(landmark.x * width), int(landmark.y * height)
-                
-                if Id in index:
-                    # Append landmark ID and pixel coordinates to the list
-                    landmark_List.append([Id, cx, cy])
-                    
-                    if drawIndex:
-                        cv.circle(img=img, center=(cx,cy), radius=radius, color=color, thickness=3)
 
-        return landmark_List
+# Startup benchmark: each run is a fresh interpreter, so imports are measured cold. "on demand" builds the
+# model on the first frame; "warmUp()" builds and primes it while the (simulated) camera opens.
+if __name__ == "__main__":
+    import json
+    import os
+    import subprocess
+    import sys
+
+    camera_open = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5     # seconds a webcam typically takes to open
+
+    child = r'''
+import json, sys, time
+start = time.perf_counter()
+import numpy as np
+from _handDetector_module import HandDetector
+moduleImport = time.perf_counter() - start
+detector = HandDetector()
+construct = time.perf_counter() - start - moduleImport
+if sys.argv[1] == "warm":
+    detector.warmUp()
+time.sleep(float(sys.argv[2]))      # stands in for opening the camera
+frameReady = time.perf_counter()
+detector.processHandImg(np.zeros((480, 640, 3), dtype=np.uint8))
+done = time.perf_counter()
+print(json.dumps({"module_import": moduleImport, "construct": construct, **detector.startupTimes,
+                  "wait_after_camera": done - frameReady, "first_result": done - start}))
+'''
+    print(f"camera open simulated as {camera_open * 1000:.0f} ms\n")
+    print(f"{'':<11}{'module':>8}{'HandDetector()':>16}{'mediapipe':>11}{'build':>8}{'1st infer':>11}"
+          f"{'wait after cam':>16}{'1st result':>12}   (ms)")
+    for label, mode in (("on demand", "cold"), ("warmUp()", "warm")):
+        out = subprocess.run([sys.executable, "-c", child, mode, str(camera_open)], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+        t = {key: value * 1000 for key, value in json.loads(out.splitlines()[-1]).items()}
+        print(f"{label:<11}{t['module_import']:8.0f}{t['construct']:16.1f}{t['import']:11.0f}{t['build']:8.0f}"
+              f"{t['first_inference']:11.0f}{t['wait_after_camera']:16.0f}{t['first_result']:12.0f}")
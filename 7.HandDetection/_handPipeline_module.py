@@ -0,0 +1,306 @@
+"""
+This module defines `HandPipeline`, which runs hand tracking as three pipelined stages in separate processes
+instead of one after the other on one thread:
+
+    capture process  ->  inference process(es)  ->  main process (drawing / display)
+         |                      |                           |
+         +---- frames in a shared-memory ring buffer (never pickled, never copied) ----+
+
+- The capture process decodes every frame straight into a free slot of a shared-memory ring of `slots`
+  frames and passes only the slot number, frame id and capture time on through a queue.
+- `workers` inference processes each run their own HandDetector on the slots they receive and send back
+  only the landmark arrays (a few hundred bytes).
+- The main process gets the results through `pipe.frames()`, in frame order (a reorder buffer puts results
+  from several workers back in sequence). The frame it yields is the shared slot itself: draw on it and
+  show it; the slot goes back to the capture process when you ask for the next frame.
+
+While the main process draws frame N, inference runs on frame N+1 and capture fills frame N+2, so the
+throughput approaches that of the slowest stage (usually inference) instead of the sum of all stages. More
+inference workers raise it further on multi-core machines (each worker tracks only every k-th frame, so the
+tracking between frames is less effective with more than one).
+
+Latency: `pipe.timer` (a StageTimer) records "end_to_end" (capture until the main process asks for the next
+frame, i.e. after drawing and display), "inference" (measured in the workers), "wait" (main process
+waiting for the next in-order result) and the FPS. Add your own stages to the same timer.
+
+Live sources (drop=True): when all slots are busy the capture process grabs and drops frames instead of
+waiting, so what you see stays close to live (`pipe.dropped` counts them). Files: use drop=False to keep
+every frame.
+
+Sources: webcam index, video file path, recording directory (_recording_module.py; replayed at recorded speed
+with drop=True, every frame as fast as possible with drop=False), or a picklable function returning an iterator of frames (e.g.
+`functools.partial(synthetic_source, 640, 480, 300)`), which is called in the capture process.
+"""
+
+import multiprocessing as mp
+import queue
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import cv2 as cv
+import numpy as np
+from _recording_module import ReplaySource, is_recording
+from _stageTimer_module import StageTimer
+
+# One in-order result: the frame (a shared slot, valid until the next one is requested), its landmarks as
+# (num_hands, 21, 3) [Id, cx, cy] pixels and normalized x, y, z, the handedness labels and the capture time
+PipelineFrame = namedtuple("PipelineFrame", "frameId frame landmarksPx landmarks handedness captureTime")
+
+
+# Attach to the ring created by the main process (which unlinks it)
+def _attach(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # child processes share the main process' resource tracker, which already knows the block
+    return shared_memory.SharedMemory(name=name)
+
+
+# Capture process: decode frames into free slots and hand them to the inference workers
+def _capture(source, shm_name, shape, slots, free_slots, jobs, stop, dropped, workers, drop, fps):
+    shm = _attach(shm_name)
+    ring = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=shm.buf)
+    height, width = shape[:2]
+
+    # read(slot_view) -> frame or None at the end; read(None) grabs a frame and throws it away
+    if is_recording(source):
+        cap = ReplaySource(source, realtime=drop)
+
+        def read(view):
+            ret, frame = cap.read(view)
+            return frame if ret else None
+    elif isinstance(source, (int, str)):
+        cap = cv.VideoCapture(source)
+        if isinstance(source, int):
+            cap.set(cv.CAP_PROP_FRAME_WIDTH, width)
+            cap.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+
+        def read(view):
+            if view is None:
+                return True if cap.grab() else None
+            ret, frame = cap.read(view)
+            return frame if ret else None
+    else:
+        cap = None
+        iterator = iter(source())
+
+        def read(view):
+            return next(iterator, None)
+
+    interval = 1.0 / fps if fps else 0.0
+    nextTime = time.perf_counter()
+    frameId = 0
+    view = None
+    try:
+        while not stop.is_set():
+            try:
+                slot = free_slots.get(block=not drop, timeout=None if drop else 0.1)
+            except queue.Empty:
+                if not drop:
+                    continue
+                # every slot is busy downstream: read the frame anyway (stay live) and drop it
+                if read(None) is None:
+                    break
+                dropped.value += 1
+                continue
+
+            view = ring[slot]
+            frame = read(view)
+            if frame is None:
+                free_slots.put(slot)
+                break
+            captureTime = time.perf_counter()
+            if frame is not view:
+                # a source that can't decode into the slot, or a frame of another size
+                if frame.shape[:2] != (height, width):
+                    cv.resize(frame, (width, height), dst=view)
+                else:
+                    view[...] = frame
+
+            jobs.put((slot, frameId, captureTime))
+            frameId += 1
+
+            if interval:
+                nextTime += interval
+                delay = nextTime - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+    finally:
+        for _ in range(workers):
+            jobs.put(None)      # end of stream, one marker per worker
+        if cap is not None:
+            cap.release()
+        del ring, view
+        shm.close()
+
+
+# Inference process: run the hand detector on each slot and send back the landmark arrays
+def _inference(shm_name, shape, slots, jobs, results, detector_kwargs):
+    from _handDetector_module import HandDetector
+
+    shm = _attach(shm_name)
+    ring = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=shm.buf)
+    detector = HandDetector(**detector_kwargs)
+    detector.warmUp(shape)      # load the model while the capture process opens the source
+    try:
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            slot, frameId, captureTime = job
+            start = time.perf_counter()
+            detector.processHandImg(ring[slot])
+            elapsed = time.perf_counter() - start
+            results.put((frameId, slot, captureTime, elapsed,
+                         detector.landmarksPx, detector.landmarks, detector.handedness))
+    finally:
+        results.put(None)
+        del ring
+        shm.close()
+
+
+class HandPipeline:
+    def __init__(self, source=0, width=640, height=480, slots=6, workers=1, drop=True, fps=None,
+                 detector_kwargs=None, timer=None):
+        self.shape = (height, width, 3)
+        self.slots = max(slots, workers + 2)    # one being captured, one per worker, one being drawn
+        self.workers = workers
+        self.timer = timer if timer is not None else StageTimer()
+
+        ctx = mp.get_context("spawn")           # MediaPipe doesn't survive fork() in a threaded parent
+        self._shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.shape)) * self.slots)
+        self._free = ctx.Queue(maxsize=self.slots)
+        self._jobs = ctx.Queue()
+        self._results = ctx.Queue()
+        self._stop = ctx.Event()
+        self._dropped = ctx.Value("i", 0, lock=False)
+        for slot in range(self.slots):
+            self._free.put(slot)
+
+        self._ring = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._processes = [ctx.Process(target=_inference, name=f"HandPipeline-inference-{i}", daemon=True,
+                                       args=(self._shm.name, self.shape, self.slots, self._jobs, self._results,
+                                             detector_kwargs or {}))
+                           for i in range(workers)]
+        self._processes.append(ctx.Process(target=_capture, name="HandPipeline-capture", daemon=True,
+                                           args=(source, self._shm.name, self.shape, self.slots, self._free, self._jobs,
+                                                 self._stop, self._dropped, workers, drop, fps)))
+        for process in self._processes:
+            process.start()
+        self._closed = False
+
+    @property
+    def dropped(self):
+        return self._dropped.value
+
+    # generator of PipelineFrame in frame order; each frame's slot is recycled when the next one is requested
+    def frames(self):
+        pending = {}        # reorder buffer: frameId -> result that arrived early
+        nextId = 0
+        finished = 0
+        held = None         # (slot, captureTime) of the frame the caller is using
+        try:
+            while True:
+                if held is not None:
+                    slot, captureTime = held
+                    self.timer.add("end_to_end", time.perf_counter() - captureTime)
+                    self.timer.frame()
+                    self._free.put(slot)
+                    held = None
+
+                with self.timer.stage("wait"):
+                    while nextId not in pending and finished < self.workers:
+                        try:
+                            result = self._results.get(timeout=1.0)
+                        except queue.Empty:
+                            if not any(process.is_alive() for process in self._processes):
+                                break
+                            continue
+                        if result is None:
+                            finished += 1
+                        else:
+                            pending[result[0]] = result
+                if nextId not in pending:
+                    return
+
+                frameId, slot, captureTime, inferenceTime, landmarksPx, landmarks, handedness = pending.pop(nextId)
+                nextId += 1
+                self.timer.add("inference", inferenceTime)
+                held = (slot, captureTime)
+                yield PipelineFrame(frameId, self._ring[slot], landmarksPx, landmarks, handedness, captureTime)
+        finally:
+            if held is not None:
+                self._free.put(held[0])
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+
+        # keep the queues moving so the processes can see the stop event and exit
+        deadline = time.perf_counter() + 3.0
+        while any(process.is_alive() for process in self._processes) and time.perf_counter() < deadline:
+            for q in (self._results, self._free):
+                try:
+                    while True:
+                        q.get_nowait()
+                except queue.Empty:
+                    pass
+            for process in self._processes:
+                process.join(timeout=0.05)
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+        del self._ring
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Headless benchmark: serial loop vs. pipeline on synthetic 640x480 frames
+if __name__ == "__main__":
+    from functools import partial
+
+    from _frameGrabber_module import synthetic_source
+    from _handDetector_module import HandDetector
+    from _overlay_module import Overlay
+
+    num_frames = 300
+    overlay = Overlay()
+
+    def render(frame, landmarksPx):
+        overlay.landmarks(landmarksPx[:, :, 1:])
+        overlay.render(frame)
+        cv.imencode(".jpg", frame)      # stands in for cv.imshow (display) without a window
+
+    detector = HandDetector()
+    start = time.perf_counter()
+    for frame in synthetic_source(640, 480, num_frames):
+        detector.processHandImg(frame)
+        render(frame, detector.landmarksPx)
+    serial = num_frames / (time.perf_counter() - start)
+    print(f"serial:   {serial:.1f} FPS")
+
+    for workers in (1, 2):
+        with HandPipeline(partial(synthetic_source, 640, 480, num_frames), workers=workers, drop=False) as pipe:
+            count = 0
+            start = None
+            for result in pipe.frames():
+                if start is None:
+                    start = time.perf_counter()     # skip process start-up and model loading
+                render(result.frame, result.landmarksPx)
+                count += 1
+            fps = (count - 1) / (time.perf_counter() - start)
+            stages = pipe.timer.summary()["stages"]
+            print(f"pipeline ({workers} inference worker{'s' if workers > 1 else ''}): {fps:.1f} FPS, "
+                  f"end-to-end p50 {stages['end_to_end']['p50_ms']:.1f} ms, p99 {stages['end_to_end']['p99_ms']:.1f} ms, "
+                  f"inference p50 {stages['inference']['p50_ms']:.1f} ms")
@@ -0,0 +1,171 @@
+"""
+This module smooths hand landmarks over time and predicts where they will be between inferences.
+
+MediaPipe returns every landmark independently per frame, so even a still hand jitters by a pixel or two,
+and running the model on fewer frames makes the landmarks jump. `LandmarkFilter` fixes both:
+
+- Filtering: a One-Euro filter (Casiez et al., 2012) per co-ordinate, vectorized over all hands x 21
+  landmarks x (x, y) in a few NumPy operations. It is a low-pass filter whose cutoff rises with speed:
+  slow movements are smoothed strongly (no jitter), fast movements pass through almost unfiltered (no lag).
+  - min_cutoff (Hz): smoothing of a still hand; lower = steadier, but more lag when it starts moving
+  - beta: how quickly the cutoff rises with speed (normalized image widths per second); higher = less lag
+  - d_cutoff (Hz): smoothing of the speed estimate
+- Prediction: the filter also keeps a smoothed velocity per landmark, so `predict(t)` extrapolates the
+  landmarks to any time t after the last update (at most `max_predict` seconds ahead, then they hold).
+  Run the model on every second frame and predict the others, or predict the landmarks of a frame whose
+  inference is still running in another process (HandPipeline) up to the time it is displayed.
+
+Landmarks are normalized (num_hands, 21, 3) arrays as in HandDetector.landmarks; z is passed through.
+A hand's history is reset when the number of hands or their handedness labels change.
+
+    landmarkFilter = LandmarkFilter()
+    smooth = landmarkFilter.update(detector.landmarks, timestamp, detector.handedness)
+    ahead = landmarkFilter.predict(time.perf_counter())
+"""
+
+import math
+import time
+
+import numpy as np
+
+
+# smoothing factor of an exponential filter with the given cutoff frequency (Hz) at time step dt (s)
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    # vectorized One-Euro filter: every element of the arrays passed to __call__ is filtered independently
+    def __init__(self, min_cutoff=1.0, beta=30.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.value = None       # last filtered value
+        self.velocity = None    # last filtered derivative (units per second)
+        self.time = None
+
+    # filter x (any shape, same shape on every call) observed at time t (seconds)
+    def __call__(self, x, t):
+        x = np.asarray(x, dtype=np.float64)
+        if self.value is None or self.value.shape != x.shape:
+            self.value = x.copy()
+            self.velocity = np.zeros_like(x)
+            self.time = t
+            return self.value.copy()
+
+        dt = t - self.time
+        if dt <= 0:
+            dt = 1e-3           # repeated timestamp: treat as a very short step instead of dividing by 0
+
+        # smoothed speed, then a per-element cutoff: faster elements are filtered less
+        a_d = _alpha(self.d_cutoff, dt)
+        self.velocity += a_d * ((x - self.value) / dt - self.velocity)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.velocity)
+        tau = 1.0 / (2 * np.pi * cutoff)
+        a = 1.0 / (1.0 + tau / dt)
+        self.value += a * (x - self.value)
+        self.time = t
+        return self.value.copy()
+
+    # value extrapolated to time t with the smoothed velocity, at most `horizon` seconds past the last update
+    def predict(self, t, horizon=0.1):
+        if self.value is None:
+            return None
+        ahead = min(max(t - self.time, 0.0), horizon)
+        return self.value + self.velocity * ahead
+
+
+class LandmarkFilter:
+    def __init__(self, min_cutoff=1.0, beta=30.0, d_cutoff=1.0, max_predict=0.1):
+        self.max_predict = max_predict      # seconds the prediction may run ahead of the last update
+        self._xy = OneEuroFilter(min_cutoff, beta, d_cutoff)
+        self._z = None                      # last z (passed through unfiltered)
+        self._handedness = None
+
+    def reset(self):
+        self._xy.reset()
+        self._z = None
+        self._handedness = None
+
+    # filter one frame of normalized (num_hands, 21, 3) landmarks observed at time t (default: now)
+    def update(self, landmarks, t=None, handedness=None):
+        t = time.perf_counter() if t is None else t
+        landmarks = np.asarray(landmarks)
+        handedness = list(handedness) if handedness is not None else None
+        if not len(landmarks):
+            self.reset()
+            return landmarks.astype(np.float32)
+
+        # a hand appeared, disappeared or switched: its history belongs to another hand
+        if self._xy.value is None or len(landmarks) != len(self._xy.value) or handedness != self._handedness:
+            self._xy.reset()
+        self._handedness = handedness
+
+        out = np.empty(landmarks.shape, dtype=np.float32)
+        out[:, :, :2] = self._xy(landmarks[:, :, :2], t)
+        out[:, :, 2] = self._z = landmarks[:, :, 2]
+        return out
+
+    # landmarks extrapolated to time t (default: now); an empty array when no hand is being tracked
+    def predict(self, t=None):
+        t = time.perf_counter() if t is None else t
+        xy = self._xy.predict(t, self.max_predict)
+        if xy is None:
+            return np.empty((0, 21, 3), dtype=np.float32)
+        out = np.empty(xy.shape[:2] + (3,), dtype=np.float32)
+        out[:, :, :2] = xy
+        out[:, :, 2] = self._z
+        return out
+
+    # timestamp of the last update (None before the first one)
+    def lastTime(self):
+        return self._xy.time
+
+
+# Headless check: a noisy hand moving back and forth, observed at 30 FPS and at 15 FPS (every second frame)
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    fps = 30
+    times = np.arange(0, 10, 1 / fps)
+    base = rng.uniform(0.3, 0.7, (1, 21, 3))
+    # still for 2 s, then a sweep of 0.4 image widths per second back and forth
+    motion = np.where(times < 2, 0.0, 0.2 * np.sin((times - 2) * 2))
+    truth = np.repeat(base[None], len(times), axis=0)
+    truth[:, :, :, 0] += motion[:, None, None]
+    noisy = truth + rng.normal(0, 0.003, truth.shape)     # ~2 px jitter at 640 px
+
+    still = times < 2
+
+    def error_px(estimate, frame):
+        return np.abs(estimate[:, :, :2] - truth[frame][:, :, :2]).mean() * 640
+
+    raw, filtered = np.zeros(len(times)), np.zeros(len(times))
+    landmarkFilter = LandmarkFilter()
+    for frame, t in enumerate(times):
+        raw[frame] = error_px(noisy[frame], frame)
+        filtered[frame] = error_px(landmarkFilter.update(noisy[frame], t, ["Right"]), frame)
+    print(f"30 FPS inference, mean error: still hand raw {raw[still].mean():.2f} px, filtered {filtered[still].mean():.2f} px; "
+          f"moving hand raw {raw[~still].mean():.2f} px, filtered {filtered[~still].mean():.2f} px")
+
+    landmarkFilter = LandmarkFilter()
+    held, predicted = [], []
+    for frame, t in enumerate(times):
+        if frame % 2 == 0:
+            last = landmarkFilter.update(noisy[frame], t, ["Right"])
+            continue
+        if not still[frame]:
+            held.append(error_px(last, frame))      # reuse the last result on skipped frames
+            predicted.append(error_px(landmarkFilter.predict(t), frame))
+    print(f"15 FPS inference, moving hand on the skipped frames: holding the last result {np.mean(held):.2f} px, "
+          f"predicted {np.mean(predicted):.2f} px")
+
+    landmarkFilter = LandmarkFilter()
+    start = time.perf_counter()
+    for frame, t in enumerate(times):
+        landmarkFilter.update(noisy[frame], t, ["Right"])
+        landmarkFilter.predict(t + 0.016)
+    print(f"update + predict: {(time.perf_counter() - start) / len(times) * 1e6:.0f} us per frame")
@@ -0,0 +1,247 @@
+"""
+This module defines `MultiStreamRunner`, which runs one detector per video source (webcams or video files)
+on a bounded number of worker processes, so several cameras can be monitored from one script and use all
+CPU cores.
+
+- Every stream gets its own processor (e.g. its own HandDetector or colour labeler), created in the worker
+  process from `processor_factory`, a picklable function (or functools.partial) returning an object with
+  `process(frame) -> dict` (per-frame results, e.g. {"hands": 2}) and optionally `draw(image, scale)`, which
+  draws the last results on a copy of the frame resized by `scale` (for the mosaic).
+- Streams are spread over `workers` processes (default: one per stream, at most one per CPU). A worker with
+  several streams takes turns reading the newest frame of each. Each worker is pinned to its own CPU
+  (`os.sched_setaffinity`, Linux) and OpenCV runs single-threaded inside it, so workers don't compete for cores.
+- Workers send a small report per stream every `report_every` seconds: frames, FPS, p50 / p95 processing
+  time, the last result and (with show=True) an annotated thumbnail. The main process merges them into one
+  table (`format_table()`) and, optionally, one mosaic window.
+- Video files can loop forever (loop=True), so N looping files make a headless load test;
+  `make_test_videos()` writes such files.
+
+Example:
+    runner = MultiStreamRunner([0, 1, "cam3.mp4"], partial(color_processor, palette), workers=2)
+    runner.run(duration=60, show=True)
+"""
+
+import math
+import multiprocessing as mp
+import os
+import queue
+import time
+
+import cv2 as cv
+import numpy as np
+from _frameGrabber_module import FrameGrabber, synthetic_source
+from _stageTimer_module import StageTimer
+
+
+# CPUs this process may run on
+def available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+# Worker process: read, process and report every stream assigned to it
+def _worker(workerId, streams, processor_factory, cpu, loop, fps, stop, reports, report_every, thumbnail_width):
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {cpu})
+    cv.setNumThreads(1)     # one core per worker: parallelism comes from the processes
+
+    states = []
+    for streamId, source in streams:
+        live = isinstance(source, int)
+        states.append({
+            "id": streamId,
+            "source": source,
+            # webcams: newest frame only; files: every frame, restarted at the end with loop=True
+            "grabber": FrameGrabber(source, mode="latest" if live else "all", loop=loop and not live,
+                                    fps=fps, reuse_frames=True),
+            "processor": processor_factory(),
+            "timer": StageTimer(),
+            "result": {},
+            "finished": False,
+        })
+
+    lastReport = time.perf_counter()
+    try:
+        while not stop.is_set() and not all(state["finished"] for state in states):
+            for state in states:
+                if state["finished"]:
+                    continue
+                ret, frame = state["grabber"].read(timeout=0.05 if len(states) > 1 else 0.5)
+                if not ret:
+                    state["finished"] = state["grabber"].ended()
+                    continue
+                with state["timer"].stage("process"):
+                    state["result"] = state["processor"].process(frame)
+                state["timer"].frame()
+                state["frame"] = frame
+
+            now = time.perf_counter()
+            if now - lastReport >= report_every:
+                lastReport = now
+                for state in states:
+                    reports.put(_report(workerId, cpu, state, thumbnail_width))
+    finally:
+        for state in states:
+            reports.put(_report(workerId, cpu, state, thumbnail_width))
+            state["grabber"].release()
+        reports.put(("done", workerId))
+
+
+def _report(workerId, cpu, state, thumbnail_width):
+    summary = state["timer"].summary()
+    process = summary["stages"].get("process", {})
+    report = {
+        "stream": state["id"],
+        "source": str(state["source"]),
+        "worker": workerId,
+        "cpu": cpu,
+        "frames": process.get("count", 0),
+        "fps": summary["fps"],
+        "p50_ms": process.get("p50_ms", 0.0),
+        "p95_ms": process.get("p95_ms", 0.0),
+        "result": state["result"],
+        "finished": state["finished"],
+        "thumbnail": None,
+    }
+    frame = state.get("frame")
+    if thumbnail_width and frame is not None:
+        # annotate a small copy only (the frame buffer belongs to the grabber)
+        scale = thumbnail_width / frame.shape[1]
+        thumbnail = cv.resize(frame, (thumbnail_width, max(1, round(frame.shape[0] * scale))), interpolation=cv.INTER_AREA)
+        if hasattr(state["processor"], "draw"):
+            state["processor"].draw(thumbnail, scale)
+        report["thumbnail"] = thumbnail
+    return report
+
+
+class MultiStreamRunner:
+    def __init__(self, sources, processor_factory, workers=None, cpus=None, pin=True, loop=True, fps=None,
+                 report_every=1.0):
+        self.sources = list(sources)
+        cpus = list(cpus) if cpus is not None else available_cpus()
+        self.workers = max(1, min(workers or len(cpus), len(self.sources)))
+        self.processor_factory = processor_factory
+        self.loop = loop
+        self.fps = fps                          # pace file sources (None = as fast as possible)
+        self.report_every = report_every
+
+        # stream i goes to worker i % workers, worker w is pinned to cpus[w % len(cpus)]
+        self.assignment = [[(i, source) for i, source in enumerate(self.sources) if i % self.workers == w]
+                           for w in range(self.workers)]
+        self.cpus = [cpus[w % len(cpus)] if pin else None for w in range(self.workers)]
+        self.streams = {}                       # stream id -> last report
+
+    def run(self, duration=None, show=False, print_every=5.0, thumbnail_width=320):
+        ctx = mp.get_context("spawn")           # MediaPipe doesn't survive fork()
+        stop = ctx.Event()
+        reports = ctx.Queue()
+        processes = [ctx.Process(target=_worker, name=f"MultiStream-{w}", daemon=True,
+                                 args=(w, streams, self.processor_factory, self.cpus[w], self.loop, self.fps,
+                                       stop, reports, self.report_every, thumbnail_width if show else 0))
+                     for w, streams in enumerate(self.assignment)]
+        for process in processes:
+            process.start()
+
+        start = time.perf_counter()
+        lastPrint = start
+        running = len(processes)
+        try:
+            while running:
+                if duration is not None and time.perf_counter() - start >= duration:
+                    break
+                try:
+                    report = reports.get(timeout=0.1)
+                except queue.Empty:
+                    report = None
+                if isinstance(report, tuple):
+                    running -= 1
+                elif report is not None:
+                    self.streams[report["stream"]] = report
+
+                if show:
+                    if report is not None:
+                        cv.imshow("streams", self.mosaic())
+                    if cv.waitKey(1) & 0xFF == ord("q"):
+                        break
+                if print_every and time.perf_counter() - lastPrint >= print_every:
+                    lastPrint = time.perf_counter()
+                    print(self.format_table(), flush=True)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+            # collect the final reports while the workers shut down
+            deadline = time.perf_counter() + 5.0
+            while running and time.perf_counter() < deadline:
+                try:
+                    report = reports.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if isinstance(report, tuple):
+                    running -= 1
+                else:
+                    self.streams[report["stream"]] = report
+            for process in processes:
+                process.join(timeout=1.0)
+                if process.is_alive():
+                    process.terminate()
+            if show:
+                cv.destroyWindow("streams")
+        return self.summary()
+
+    # totals over all streams plus the last report of each (without thumbnails)
+    def summary(self):
+        streams = [{key: value for key, value in report.items() if key != "thumbnail"}
+                   for _streamId, report in sorted(self.streams.items())]
+        return {
+            "streams": streams,
+            "total_fps": sum(stream["fps"] for stream in streams),
+            "total_frames": sum(stream["frames"] for stream in streams),
+            "workers": self.workers,
+        }
+
+    def format_table(self):
+        lines = [f"{'stream':<7}{'source':<24}{'worker':>7}{'cpu':>5}{'frames':>8}{'fps':>7}{'p50 ms':>8}{'p95 ms':>8}  result"]
+        for streamId, report in sorted(self.streams.items()):
+            source = report["source"] if len(report["source"]) <= 22 else "..." + report["source"][-19:]
+            lines.append(f"{streamId:<7}{source:<24}{report['worker']:>7}{str(report['cpu']):>5}{report['frames']:>8}"
+                         f"{report['fps']:>7.1f}{report['p50_ms']:>8.1f}{report['p95_ms']:>8.1f}  {report['result']}")
+        total = self.summary()
+        lines.append(f"total: {total['total_fps']:.1f} FPS over {len(self.streams)} streams, {self.workers} workers")
+        return "\n".join(lines)
+
+    # all stream thumbnails in one grid image, each labelled with its stream id and FPS
+    def mosaic(self, columns=None):
+        thumbnails = [(streamId, report) for streamId, report in sorted(self.streams.items())
+                      if report["thumbnail"] is not None]
+        if not thumbnails:
+            return np.zeros((240, 320, 3), dtype=np.uint8)
+        height = max(report["thumbnail"].shape[0] for _streamId, report in thumbnails)
+        width = max(report["thumbnail"].shape[1] for _streamId, report in thumbnails)
+        columns = columns or math.ceil(math.sqrt(len(thumbnails)))
+        rows = math.ceil(len(thumbnails) / columns)
+
+        grid = np.zeros((rows * height, columns * width, 3), dtype=np.uint8)
+        for i, (streamId, report) in enumerate(thumbnails):
+            y, x = (i // columns) * height, (i % columns) * width
+            thumbnail = report["thumbnail"]
+            grid[y:y + thumbnail.shape[0], x:x + thumbnail.shape[1]] = thumbnail
+            cv.putText(grid, f"#{streamId} {report['fps']:.1f} FPS", (x + 8, y + 20), cv.FONT_HERSHEY_SIMPLEX, 0.5,
+                       (0, 255, 0), 1, cv.LINE_AA)
+        return grid
+
+
+# Write `count` short synthetic videos (moving squares) for headless testing with looping files
+def make_test_videos(directory, count, num_frames=120, width=640, height=480, fps=30):
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"stream_{i}.avi")
+        if not os.path.exists(path):
+            writer = cv.VideoWriter(path, cv.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+            for frame in synthetic_source(width, height, num_frames):
+                writer.write(np.roll(frame, i * 37, axis=0))    # a different square position per stream
+            writer.release()
+        paths.append(path)
+    return paths
@@ -0,0 +1,180 @@
+"""
+This module defines `Overlay`, a display list for annotations (lines, boxes, circles, text, sprites and
+hand landmarks). You add everything you want to draw for a frame, then call `render(frame)` once.
+
+Why it is faster than calling cv.line / cv.rectangle / cv.putText one by one:
+- Primitives of the same kind and style are drawn together: all lines / boxes / hand connections with one
+  cv.polylines call, all filled boxes with one cv.fillPoly call. (cv.rectangle itself draws a closed
+  4-point polyline, so the pixels are the same.)
+- Text is rasterized once per (text, font, scale, colour, thickness) into a small cached patch with an
+  alpha mask, and later frames only blend that patch into its region of the frame. Any image with an
+  alpha mask can be prepared once with `make_patch()` and added with `sprite()`.
+- Every primitive only touches its own pixels. For a translucent overlay (`render(frame, alpha=0.5)`)
+  everything is drawn on one layer and blended with the frame in a single pass.
+- Drawing order is by kind: filled boxes, then lines / box outlines, then circles, then text and sprites.
+  Each primitive gives exactly the pixels of the matching cv.* call.
+
+Example:
+    overlay = Overlay()
+    overlay.rectangles(boxes, color=c.YELLOW, thickness=3)      # boxes: (N, 4) x1, y1, x2, y2
+    overlay.text("birds", (20, 40), color=c.BLACK)
+    overlay.render(img)
+"""
+
+from collections import OrderedDict
+
+import cv2 as cv
+import numpy as np
+
+# Connections between the 21 hand landmarks (same as mediapipe's HAND_CONNECTIONS)
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),             # thumb
+    (0, 5), (5, 6), (6, 7), (7, 8),             # index finger
+    (5, 9), (9, 10), (10, 11), (11, 12),        # middle finger
+    (9, 13), (13, 14), (14, 15), (15, 16),      # ring finger
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),    # little finger and palm
+)
+_HAND_SEGMENTS = np.array(HAND_CONNECTIONS, dtype=np.int64)
+
+
+class Overlay:
+    def __init__(self, text_cache_size=256):
+        self.text_cache_size = text_cache_size
+        self._textCache = OrderedDict()
+        self.clear()
+
+    # forget this frame's primitives (the text cache is kept)
+    def clear(self):
+        self._polylines = {}    # (color, thickness, closed, lineType) -> list of (K, 2) point arrays
+        self._fills = {}        # (color, lineType) -> list of (K, 2) point arrays
+        self._circles = []      # (center, radius, color, thickness, lineType)
+        self._patches = []      # (patch, alpha, x, y)
+
+    # ================================
+    # Shapes
+    # ================================
+    def line(self, pt1, pt2, color, thickness=1, lineType=cv.LINE_8):
+        self._polylines.setdefault((tuple(color), thickness, False, lineType), []).append(np.array([pt1, pt2], dtype=np.int32))
+
+    # many line segments at once: segments is (N, 2, 2) [[x1, y1], [x2, y2]]
+    def lines(self, segments, color, thickness=1, lineType=cv.LINE_8):
+        segments = np.asarray(segments, dtype=np.int32).reshape(-1, 2, 2)
+        self._polylines.setdefault((tuple(color), thickness, False, lineType), []).extend(segments)
+
+    def rectangle(self, pt1, pt2, color, thickness=1, lineType=cv.LINE_8):
+        self.rectangles([[pt1[0], pt1[1], pt2[0], pt2[1]]], color, thickness, lineType)
+
+    # many boxes at once: boxes is (N, 4) x1, y1, x2, y2 (negative thickness fills them, like cv.rectangle)
+    def rectangles(self, boxes, color, thickness=1, lineType=cv.LINE_8):
+        boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        x1, y1, x2, y2 = boxes.T
+        corners = np.stack([np.stack([x1, y1], 1), np.stack([x2, y1], 1), np.stack([x2, y2], 1), np.stack([x1, y2], 1)], axis=1)
+        if thickness < 0:
+            self._fills.setdefault((tuple(color), lineType), []).extend(corners)
+        else:
+            self._polylines.setdefault((tuple(color), thickness, True, lineType), []).extend(corners)
+
+    def circle(self, center, radius, color, thickness=1, lineType=cv.LINE_8):
+        self._circles.append(((int(center[0]), int(center[1])), int(radius), tuple(color), thickness, lineType))
+
+    # many circles at once: centers is (N, 2)
+    def circles(self, centers, radius, color, thickness=1, lineType=cv.LINE_8):
+        for x, y in np.asarray(centers, dtype=np.int32).reshape(-1, 2).tolist():
+            self._circles.append(((x, y), int(radius), tuple(color), thickness, lineType))
+
+    # hand skeleton(s): points is (21, 2) or (num_hands, 21, 2) pixel co-ordinates.
+    # Default style is the one mediapipe's draw_landmarks uses (white connections, red points with a white border).
+    def landmarks(self, points, point_color=(0, 0, 255), line_color=(224, 224, 224), radius=2, thickness=2):
+        points = np.asarray(points, dtype=np.int32).reshape(-1, 21, 2)
+        if len(points) == 0:
+            return
+        self.lines(points[:, _HAND_SEGMENTS].reshape(-1, 2, 2), line_color, thickness)
+        self.circles(points.reshape(-1, 2), max(radius + 1, int(radius * 1.2)), (255, 255, 255), thickness)
+        self.circles(points.reshape(-1, 2), radius, point_color, thickness)
+
+    # ================================
+    # Text and sprites (cached patches)
+    # ================================
+    # same arguments as cv.putText; org is the bottom-left corner of the text
+    def text(self, text, org, fontFace=cv.FONT_HERSHEY_SIMPLEX, fontScale=1, color=(255, 255, 255),
+             thickness=1, lineType=cv.LINE_8):
+        key = (text, fontFace, fontScale, tuple(color), thickness, lineType)
+        cached = self._textCache.get(key)
+        if cached is None:
+            cached = self._renderText(*key)
+            self._textCache[key] = cached
+            if len(self._textCache) > self.text_cache_size:
+                self._textCache.popitem(last=False)
+        else:
+            self._textCache.move_to_end(key)
+
+        patch, (dx, dy) = cached
+        self._patches.append((patch, int(org[0]) - dx, int(org[1]) - dy))
+
+    # rasterize text once: a patch (see make_patch) and the offset of org inside it
+    @staticmethod
+    def _renderText(text, fontFace, fontScale, color, thickness, lineType):
+        (width, height), baseline = cv.getTextSize(text, fontFace, fontScale, thickness)
+        margin = thickness + 1
+        alpha = np.zeros((height + baseline + 2 * margin, width + 2 * margin), dtype=np.uint8)
+        cv.putText(alpha, text, (margin, margin + height), fontFace, fontScale, 255, thickness, lineType)
+
+        image = np.empty(alpha.shape + (3,), dtype=np.uint8)
+        image[:] = color
+        return make_patch(image, alpha), (margin, margin + height)
+
+    # a pre-rendered patch (from make_patch) whose top-left corner goes at org
+    def sprite(self, patch, org):
+        self._patches.append((patch, int(org[0]), int(org[1])))
+
+    # ================================
+    # Rendering
+    # ================================
+    def render(self, frame, alpha=1.0, clear=True):
+        layer = frame if alpha >= 1.0 else frame.copy()
+
+        for (color, lineType), polygons in self._fills.items():
+            cv.fillPoly(layer, polygons, color, lineType)
+        for (color, thickness, closed, lineType), polylines in self._polylines.items():
+            cv.polylines(layer, polylines, closed, color, thickness, lineType)
+        for center, radius, color, thickness, lineType in self._circles:
+            cv.circle(layer, center, radius, color, thickness, lineType)
+        for patch, x, y in self._patches:
+            self._blend(layer, patch, x, y)
+
+        if alpha < 1.0:
+            # single composite pass for a translucent overlay
+            cv.addWeighted(layer, alpha, frame, 1.0 - alpha, 0, dst=frame)
+        if clear:
+            self.clear()
+        return frame
+
+    # alpha-blend a patch into the frame at (x, y), clipped to the frame
+    @staticmethod
+    def _blend(frame, patch, x, y):
+        image, alpha, weights = patch
+        height, width = frame.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + image.shape[1], width), min(y + image.shape[0], height)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        roi = frame[y0:y1, x0:x1]
+        rows, cols = slice(y0 - y, y1 - y), slice(x0 - x, x1 - x)
+        if weights is None:
+            # binary mask: copy the covered pixels straight into the frame
+            cv.copyTo(image[rows, cols], alpha[rows, cols], roi)
+        else:
+            w1, w2 = weights
+            roi[...] = cv.blendLinear(image[rows, cols], roi, w1[rows, cols], w2[rows, cols])
+
+
+# Prepare an image with a 0-255 alpha mask for fast repeated blending with Overlay.sprite().
+# Binary masks are copied with cv.copyTo, soft (anti-aliased) ones blended with precomputed weights.
+def make_patch(image, alpha=None):
+    if alpha is None:
+        alpha = np.full(image.shape[:2], 255, dtype=np.uint8)
+    if np.isin(alpha, (0, 255)).all():
+        return image, alpha, None
+    w1 = alpha.astype(np.float32) / 255
+    return image, alpha, (w1, 1 - w1)